@@ -3,146 +3,244 @@ BASIC Scanner - Interface graphique d'installation (Windows).
 Fenêtre avec progression et notification de fin. Utilise uniquement la bibliothèque standard (tkinter).
 Lancer avec : python install_gui.py  (depuis la racine du projet)
 """
+import functools
 import os
 import queue
 import shutil
 import subprocess
 import sys
 import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# Tkinter (stdlib)
-try:
-    import tkinter as tk
-    from tkinter import ttk
-    from tkinter import messagebox
-    from tkinter import font as tkfont
-except ImportError:
-    print("Erreur : tkinter est requis. Installez Python avec les composants optionnels (tcl/tk).")
-    sys.exit(1)
+# Tkinter (stdlib) : importé à la demande par _load_tkinter(), pour que l'import du module
+# (outils, tests) ne charge pas Tcl/Tk
+tk = ttk = messagebox = tkfont = None
+
+
+def _load_tkinter() -> None:
+    """Importe tkinter et ses sous-modules dans les globales du module (lève ImportError si absent)."""
+    global tk, ttk, messagebox, tkfont
+    if tk is not None:
+        return
+    import tkinter
+    from tkinter import ttk as _ttk
+    from tkinter import messagebox as _messagebox
+    from tkinter import font as _tkfont
+    tk, ttk, messagebox, tkfont = tkinter, _ttk, _messagebox, _tkfont
 
 # Racine du projet = dossier contenant ce script
 PROJECT_ROOT = Path(__file__).resolve().parent
 VENV_PATH = PROJECT_ROOT / ".venv"
 
+# Plateforme courante (lue une fois)
+_PLATFORM = sys.platform
+
 # Sous Windows : ne pas afficher de fenêtre console pour les processus enfants (pip, venv, etc.)
-CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000) if sys.platform == "win32" else 0
-SUBPROCESS_KW = {"creationflags": CREATE_NO_WINDOW} if sys.platform == "win32" else {}
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000) if _PLATFORM == "win32" else 0
+# close_fds=False : évite l'énumération des handles à fermer (sorties capturées, aucun handle sensible)
+SUBPROCESS_KW = {"creationflags": CREATE_NO_WINDOW, "close_fds": False} if _PLATFORM == "win32" else {}
+# Pas de vérification réseau de version de pip ni d'écriture de .pyc pendant l'installation
+PIP_ENV = {**os.environ, "PIP_DISABLE_PIP_VERSION_CHECK": "1", "PYTHONDONTWRITEBYTECODE": "1", "PYTHONIOENCODING": "utf-8"}
 CONFIG_YAML = PROJECT_ROOT / "config.yaml"
 CONFIG_EXAMPLE = PROJECT_ROOT / "config.example.yaml"
 SCAN_GUI_SCRIPT = PROJECT_ROOT / "scan_gui.py"
 SHORTCUT_NAME = "BASIC Scanner"
 
 # Étapes pour la progression (texte, pourcentage max après cette étape)
-STEPS = [
-    ("Vérification de Python...", 10),
-    ("Création de l'environnement virtuel...", 25),
-    ("Installation des dépendances (cela peut prendre 1 à 2 minutes)...", 60),
-    ("Création du fichier de configuration...", 75),
-    ("Vérification des prérequis (Tesseract, Ghostscript)...", 90),
-    ("Finalisation...", 95),
-]
+Step = namedtuple("Step", "label pct")
+STEPS = (
+    Step("Vérification de Python...", 10),
+    Step("Création de l'environnement virtuel...", 25),
+    Step("Installation des dépendances (cela peut prendre 1 à 2 minutes)...", 60),
+    Step("Création du fichier de configuration...", 75),
+    Step("Vérification des prérequis (Tesseract, Ghostscript)...", 90),
+    Step("Finalisation...", 95),
+)
+
+
+# Recherche dans le PATH mémorisée : chaque exécutable n'est résolu qu'une fois
+_which = functools.cache(shutil.which)
+
+
+def _resolve_exe(cmd):
+    """Retourne le chemin absolu de cmd (résolu une seule fois), ou cmd tel quel s'il est introuvable."""
+    return _which(cmd) or cmd
 
 
 def get_pythonw_path():
     """Retourne le chemin de pythonw (sans fenêtre console) pour lancer l'interface."""
-    if sys.platform == "win32" and VENV_PATH.exists():
+    if _PLATFORM == "win32" and VENV_PATH.exists():
         pw = VENV_PATH / "Scripts" / "pythonw.exe"
         if pw.exists():
             return str(pw)
     # Fallback: pythonw dans le PATH ou même répertoire que python
-    if sys.platform == "win32":
+    if _PLATFORM == "win32":
         return "pythonw"
     return sys.executable
 
 
-def create_shortcut():
-    """
-    Crée un raccourci pour lancer l'interface (Bureau ou menu Démarrer selon l'OS).
-    Retourne (True, message) ou (False, message).
-    """
-    pythonw = get_pythonw_path()
-    target = str(SCAN_GUI_SCRIPT)
-    if not Path(target).exists():
-        return False, "Fichier scan_gui.py introuvable."
-    work_dir = str(PROJECT_ROOT)
+# Identifiants COM pour la création de raccourci .lnk en-process (sans PowerShell)
+CLSID_SHELL_LINK = "{00021401-0000-0000-C000-000000000046}"
+IID_ISHELL_LINK_W = "{000214F9-0000-0000-C000-000000000046}"
+IID_IPERSIST_FILE = "{0000010B-0000-0000-C000-000000000046}"
 
-    if sys.platform == "win32":
-        try:
-            import ctypes
-            from ctypes import wintypes
-            CSIDL_DESKTOP = 0
-            SHGFP_TYPE_CURRENT = 0
-            buf = ctypes.create_unicode_buffer(wintypes.MAX_PATH)
-            ctypes.windll.shell32.SHGetFolderPathW(0, CSIDL_DESKTOP, 0, SHGFP_TYPE_CURRENT, buf)
-            desktop = buf.value
-            lnk_path = str(Path(desktop) / (SHORTCUT_NAME + ".lnk"))
-            # Script .ps1 temporaire (here-string PowerShell : @' doit être suivi d'un saut de ligne)
-            def ps_escape(s):
-                return (s or "").replace("'", "''")
-            ps1 = PROJECT_ROOT / "_create_shortcut.ps1"
-            ps1.write_text(
-                """$lnk = @'
-""" + ps_escape(lnk_path) + """
+
+# Script PowerShell de secours pour le raccourci (here-string : @' doit être suivi d'un saut de ligne)
+_PS1_SHORTCUT_TEMPLATE = """$lnk = @'
+{lnk}
 '@
 $exe = @'
-""" + ps_escape(pythonw) + """
+{exe}
 '@
 $target = @'
-""" + ps_escape(target) + """
+{target}
 '@
 $wd = @'
-""" + ps_escape(work_dir) + """
+{wd}
 '@
 $ws = New-Object -ComObject WScript.Shell
 $s = $ws.CreateShortcut($lnk)
 $s.TargetPath = $exe
-$s.Arguments = $target
+$s.Arguments = '"' + $target + '"'
 $s.WorkingDirectory = $wd
 $s.Description = "BASIC Scanner"
 $s.Save()
-""",
-                encoding="utf-8",
-            )
+"""
+
+
+def _create_shortcut_com(lnk_path, exe, arguments, work_dir, description):
+    """
+    Crée le fichier .lnk via IShellLinkW + IPersistFile (ctypes), dans le processus courant.
+    Lève OSError si un appel COM échoue.
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class GUID(ctypes.Structure):
+        _fields_ = [
+            ("Data1", wintypes.DWORD),
+            ("Data2", wintypes.WORD),
+            ("Data3", wintypes.WORD),
+            ("Data4", ctypes.c_ubyte * 8),
+        ]
+
+    ole32 = ctypes.oledll.ole32
+
+    def guid(s):
+        g = GUID()
+        ole32.CLSIDFromString(s, ctypes.byref(g))
+        return g
+
+    def vcall(obj, index, argtypes, *args):
+        # Appel de la méthode n° index de la vtable de l'interface COM obj
+        vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+        proto = ctypes.WINFUNCTYPE(ctypes.HRESULT, ctypes.c_void_p, *argtypes)
+        return proto(vtable[index])(obj, *args)
+
+    ole32.CoInitialize(None)
+    try:
+        link = ctypes.c_void_p()
+        ole32.CoCreateInstance(
+            ctypes.byref(guid(CLSID_SHELL_LINK)), None, 1,  # CLSCTX_INPROC_SERVER
+            ctypes.byref(guid(IID_ISHELL_LINK_W)), ctypes.byref(link),
+        )
+        try:
+            # Index vtable IShellLinkW : SetDescription=7, SetWorkingDirectory=9, SetArguments=11, SetPath=20
+            vcall(link, 20, (wintypes.LPCWSTR,), exe)
+            vcall(link, 11, (wintypes.LPCWSTR,), arguments)
+            vcall(link, 9, (wintypes.LPCWSTR,), work_dir)
+            vcall(link, 7, (wintypes.LPCWSTR,), description)
+            persist = ctypes.c_void_p()
+            vcall(link, 0, (ctypes.POINTER(GUID), ctypes.POINTER(ctypes.c_void_p)),
+                  ctypes.byref(guid(IID_IPERSIST_FILE)), ctypes.byref(persist))
             try:
-                r = subprocess.run(
-                    ["powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", str(ps1)],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                    cwd=work_dir,
-                    **SUBPROCESS_KW,
-                )
-                if r.returncode == 0 and Path(lnk_path).exists():
-                    return True, f"Raccourci créé : Bureau\\{SHORTCUT_NAME}.lnk"
-                return False, r.stderr or r.stdout or "Échec création raccourci"
+                # IPersistFile::Save = index 6
+                vcall(persist, 6, (wintypes.LPCWSTR, wintypes.BOOL), lnk_path, True)
             finally:
-                ps1.unlink(missing_ok=True)
-        except Exception as e:
-            return False, str(e)
-    elif sys.platform == "darwin":
-        # Mac : créer un .command qui lance l'interface
-        desktop = Path.home() / "Desktop"
-        cmd_file = desktop / (SHORTCUT_NAME.replace(" ", "") + ".command")
+                vcall(persist, 2, ())  # Release
+        finally:
+            vcall(link, 2, ())  # Release
+    finally:
+        ctypes.windll.ole32.CoUninitialize()
+
+
+def _make_win_shortcut(pythonw, target, work_dir):
+    """Windows : raccourci .lnk sur le Bureau (COM, PowerShell en secours)."""
+    try:
+        import ctypes
+        from ctypes import wintypes
+        CSIDL_DESKTOP = 0
+        SHGFP_TYPE_CURRENT = 0
+        buf = ctypes.create_unicode_buffer(wintypes.MAX_PATH)
+        ctypes.windll.shell32.SHGetFolderPathW(0, CSIDL_DESKTOP, 0, SHGFP_TYPE_CURRENT, buf)
+        desktop = buf.value
+        lnk_path = str(Path(desktop) / (SHORTCUT_NAME + ".lnk"))
+        # 1) Création directe via COM (IShellLinkW), sans lancer PowerShell
         try:
-            cmd_file.write_text(
-                f"#!/bin/bash\ncd {repr(work_dir)}\nexec {repr(pythonw)} {repr(target)}\n",
-                encoding="utf-8",
+            # IPersistFile::Save lève une erreur en cas d'échec : pas besoin de re-tester l'existence du .lnk
+            _create_shortcut_com(lnk_path, pythonw, f'"{target}"', work_dir, "BASIC Scanner")
+            return True, f"Raccourci créé : Bureau\\{SHORTCUT_NAME}.lnk"
+        except OSError:
+            pass
+        # 2) Fallback : script .ps1 temporaire (_PS1_SHORTCUT_TEMPLATE)
+        def ps_escape(s):
+            return (s or "").replace("'", "''")
+        script = _PS1_SHORTCUT_TEMPLATE.format_map({
+            "lnk": ps_escape(lnk_path),
+            "exe": ps_escape(pythonw),
+            "target": ps_escape(target),
+            "wd": ps_escape(work_dir),
+        })
+        ps1 = PROJECT_ROOT / "_create_shortcut.ps1"
+        # UTF-8 avec BOM : Windows PowerShell 5.1 lit sinon le script en ANSI (chemins accentués)
+        ps1.write_bytes(script.encode("utf-8-sig"))
+        try:
+            r = subprocess.run(
+                [_resolve_exe("powershell"), "-NoProfile", "-ExecutionPolicy", "Bypass", "-File", str(ps1)],
+                capture_output=True,
+                text=True,
+                timeout=10,
+                cwd=work_dir,
+                **SUBPROCESS_KW,
             )
-            cmd_file.chmod(0o755)
-            return True, f"Raccourci créé : Bureau\\{cmd_file.name}"
-        except Exception as e:
-            return False, str(e)
-    else:
-        # Linux : .desktop
-        desktop = Path.home() / "Desktop"
-        if not desktop.exists():
-            desktop = Path.home() / ".local" / "share" / "applications"
+            if r.returncode == 0 and Path(lnk_path).exists():
+                return True, f"Raccourci créé : Bureau\\{SHORTCUT_NAME}.lnk"
+            return False, r.stderr or r.stdout or "Échec création raccourci"
+        finally:
+            ps1.unlink(missing_ok=True)
+    except Exception as e:
+        return False, str(e)
+
+
+def _make_mac_shortcut(pythonw, target, work_dir):
+    """Mac : fichier .command sur le Bureau qui lance l'interface."""
+    desktop = Path.home() / "Desktop"
+    cmd_file = desktop / (SHORTCUT_NAME.replace(" ", "") + ".command")
+    try:
+        cmd_file.write_text(
+            f"#!/bin/bash\ncd {repr(work_dir)}\nexec {repr(pythonw)} {repr(target)}\n",
+            encoding="utf-8",
+        )
+        cmd_file.chmod(0o755)
+        return True, f"Raccourci créé : Bureau\\{cmd_file.name}"
+    except Exception as e:
+        return False, str(e)
+
+
+def _make_linux_shortcut(pythonw, target, work_dir):
+    """Linux : fichier .desktop (Bureau, sinon menu des applications)."""
+    desktop = Path.home() / "Desktop"
+    if not desktop.is_dir():
+        # Le Bureau existe déjà quand il est présent : seul le dossier de repli est créé
+        desktop = Path.home() / ".local" / "share" / "applications"
         desktop.mkdir(parents=True, exist_ok=True)
-        desk_file = desktop / (SHORTCUT_NAME.lower().replace(" ", "_") + ".desktop")
-        try:
-            desk_file.write_text(
-                f"""[Desktop Entry]
+    desk_file = desktop / (SHORTCUT_NAME.lower().replace(" ", "_") + ".desktop")
+    try:
+        desk_file.write_text(
+            f"""[Desktop Entry]
 Type=Application
 Name={SHORTCUT_NAME}
 Comment=Interface de classement de documents scannés
@@ -150,12 +248,28 @@ Exec={pythonw} {target}
 Path={work_dir}
 Terminal=false
 """,
-                encoding="utf-8",
-            )
-            desk_file.chmod(0o755)
-            return True, f"Raccourci créé : {desk_file}"
-        except Exception as e:
-            return False, str(e)
+            encoding="utf-8",
+        )
+        desk_file.chmod(0o755)
+        return True, f"Raccourci créé : {desk_file}"
+    except Exception as e:
+        return False, str(e)
+
+
+# Implémentation du raccourci selon l'OS (Linux / autres par défaut)
+_SHORTCUT_IMPLS = {"win32": _make_win_shortcut, "darwin": _make_mac_shortcut}
+
+
+def create_shortcut():
+    """
+    Crée un raccourci pour lancer l'interface (Bureau ou menu Démarrer selon l'OS).
+    Retourne (True, message) ou (False, message).
+    """
+    target = str(SCAN_GUI_SCRIPT)
+    if not Path(target).exists():
+        return False, "Fichier scan_gui.py introuvable."
+    make = _SHORTCUT_IMPLS.get(_PLATFORM, _make_linux_shortcut)
+    return make(get_pythonw_path(), target, str(PROJECT_ROOT))
 
 
 def launch_ui_no_console():
@@ -164,7 +278,7 @@ def launch_ui_no_console():
     target = str(SCAN_GUI_SCRIPT)
     work_dir = str(PROJECT_ROOT)
     kwargs = {"cwd": work_dir, "stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
-    if sys.platform == "win32":
+    if _PLATFORM == "win32":
         kwargs["creationflags"] = CREATE_NO_WINDOW
     try:
         subprocess.Popen([pythonw, target], **kwargs)
@@ -173,88 +287,230 @@ def launch_ui_no_console():
         return False
 
 
+def exec_ui_replacing_process():
+    """
+    Remplace le processus courant (installateur) par l'interface utilisateur (os.execv),
+    sans créer de processus enfant. Ne retourne qu'en cas d'échec (False).
+    """
+    pythonw = get_pythonw_path()
+    exe = _resolve_exe(pythonw)
+    argv = [exe, str(SCAN_GUI_SCRIPT)]
+    if _PLATFORM == "win32":
+        # execv sous Windows ne protège pas les arguments contenant des espaces
+        argv = [subprocess.list2cmdline([a]) for a in argv]
+    # execv n'a pas d'équivalent à cwd= : se placer dans le projet avant de remplacer le processus
+    os.chdir(PROJECT_ROOT)
+    try:
+        os.execv(exe, argv)
+    except OSError:
+        return False
+
+
+@functools.lru_cache(maxsize=1)
 def find_python():
-    """Retourne le chemin ou la commande Python 3.11+."""
-    for cmd in ("python", "python3", "py"):
+    """Retourne le chemin ou la commande Python 3.11+ (résultat mémorisé)."""
+    # Python actuel suffisant : pas besoin de lancer de sous-processus
+    if sys.version_info >= (3, 11):
+        return sys.executable
+    # Sous Windows, le lanceur py est le plus rapide à résoudre
+    candidates = ("py", "python3", "python") if _PLATFORM == "win32" else ("python3", "python", "py")
+    for cmd in candidates:
+        cmd = _which(cmd)
+        if not cmd:
+            continue
         try:
             r = subprocess.run(
                 [cmd, "--version"],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 text=True,
                 timeout=5,
                 cwd=str(PROJECT_ROOT),
                 **SUBPROCESS_KW,
             )
-            out = (r.stdout or r.stderr or "").strip()
+            out = (r.stdout or "").strip()
             if "3.11" in out or "3.12" in out or "3.13" in out:
                 return cmd
         except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
             continue
-    # Fallback : Python actuel
-    if sys.version_info >= (3, 11):
-        return sys.executable
     return None
 
 
-def run_install(steps_queue: queue.Queue, run_tests: bool) -> None:
-    """Exécute l'installation dans un thread. Envoie (step_index, label, progress_pct) ou (None, error_msg, -1)."""
-    try:
-        python_cmd = find_python()
-        if not python_cmd:
-            steps_queue.put((None, "Python 3.11 ou supérieur est requis.", -1))
+def _fast_copy(src, dst) -> None:
+    """
+    Copie src vers dst en conservant les dates.
+    Windows : CopyFileW (copie faite par le noyau, en un appel). Ailleurs : shutil.copy2,
+    qui utilise déjà sendfile (Linux) / fcopyfile (macOS) sans passer par des tampons Python.
+    """
+    if _PLATFORM == "win32":
+        import ctypes
+        if ctypes.windll.kernel32.CopyFileW(str(src), str(dst), False):
             return
+    shutil.copy2(src, dst)
 
-        # Étape 1 : Python
-        steps_queue.put((0, STEPS[0][0], 10))
 
-        # Étape 2 : venv
-        steps_queue.put((1, STEPS[1][0], 25))
-        if not VENV_PATH.exists():
-            subprocess.run(
-                [python_cmd, "-m", "venv", str(VENV_PATH)],
-                check=True,
-                capture_output=True,
-                timeout=120,
-                cwd=str(PROJECT_ROOT),
-                **SUBPROCESS_KW,
-            )
-        python_exe = str(VENV_PATH / "Scripts" / "python.exe")
-        pip_cmd = [python_exe, "-m", "pip"]
+def _find_uv():
+    """Retourne le chemin de uv s'il est dans le PATH, sinon None."""
+    return _which("uv")
+
+
+def _pip_install_cmd(python_exe):
+    """Commande d'installation des dépendances : uv pip si disponible, sinon pip (wheels privilégiées)."""
+    uv = _find_uv()
+    if uv:
+        return [uv, "pip", "install", "--python", python_exe, "-e", ".[dev]"]
+    return [python_exe, "-m", "pip", "install", "--prefer-binary", "--disable-pip-version-check", "-e", ".[dev]"]
+
 
-        # Étape 3 : pip install
-        steps_queue.put((2, STEPS[2][0], 60))
+def _copy_config_example() -> None:
+    """Crée config.yaml à partir de config.example.yaml s'il n'existe pas encore."""
+    if not CONFIG_YAML.exists() and CONFIG_EXAMPLE.exists():
+        _fast_copy(CONFIG_EXAMPLE, CONFIG_YAML)
+
+
+def _probe_prereqs():
+    """Retourne la liste des outils externes (Tesseract, Ghostscript) introuvables dans le PATH."""
+    missing = []
+    if not _which("tesseract"):
+        missing.append("Tesseract")
+    if not (_which("gswin64c") or _which("gswin32c") or _which("gs")):
+        missing.append("Ghostscript")
+    return missing
+
+
+# Budget global de l'installation (venv + dépendances + tests), partagé par toutes les étapes
+INSTALL_TIMEOUT = 540
+
+
+class Deadline:
+    """Échéance unique : chaque étape reçoit le temps restant au lieu de son propre délai fixe."""
+
+    def __init__(self, total: float):
+        self.end = time.monotonic() + total
+
+    def remaining(self) -> float:
+        """Secondes restantes (0 si l'échéance est dépassée)."""
+        return max(0.0, self.end - time.monotonic())
+
+
+def _create_venv(python_cmd, deadline: Deadline) -> None:
+    """Crée l'environnement virtuel .venv s'il n'existe pas."""
+    if VENV_PATH.exists():
+        return
+    if python_cmd == sys.executable:
+        # Interpréteur courant : création en-process, sans relancer Python
+        import venv
+        venv.EnvBuilder(with_pip=True, symlinks=(_PLATFORM != "win32")).create(str(VENV_PATH))
+    else:
         subprocess.run(
-            pip_cmd + ["install", "-e", ".[dev]", "-q"],
+            [python_cmd, "-m", "venv", str(VENV_PATH)],
             check=True,
             capture_output=True,
-            timeout=300,
+            timeout=deadline.remaining(),
             cwd=str(PROJECT_ROOT),
             **SUBPROCESS_KW,
         )
 
-        # Étape 4 : config
-        steps_queue.put((3, STEPS[3][0], 75))
-        if not CONFIG_YAML.exists() and CONFIG_EXAMPLE.exists():
-            shutil.copy2(CONFIG_EXAMPLE, CONFIG_YAML)
 
-        # Étape 5 : prérequis (informatif, pas bloquant)
-        steps_queue.put((4, STEPS[4][0], 90))
+def _pump_install_output(stream, steps_queue: queue.Queue, tail) -> None:
+    """
+    Lit la sortie de pip ligne par ligne : chaque ligne est affichée comme libellé de l'étape,
+    la progression avance vers l'étape suivante sans l'atteindre. Garde les dernières lignes dans tail.
+    """
+    start, end = STEPS[2].pct, STEPS[3].pct
+    count = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        tail.append(line)
+        count += 1
+        steps_queue.put((2, line[:80], start + (end - start) * count / (count + 50)))
+
+
+def _install_dependencies(python_exe, steps_queue: queue.Queue, deadline: Deadline) -> None:
+    """Installe le projet et ses dépendances dans le venv (uv si disponible, beaucoup plus rapide)."""
+    cmd = _pip_install_cmd(python_exe)
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+        bufsize=1,
+        cwd=str(PROJECT_ROOT),
+        env=PIP_ENV,
+        **SUBPROCESS_KW,
+    )
+    tail = deque(maxlen=20)
+    pump = threading.Thread(target=_pump_install_output, args=(proc.stdout, steps_queue, tail), daemon=True)
+    pump.start()
+    try:
+        proc.wait(timeout=deadline.remaining())
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        raise
+    pump.join(timeout=5)
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr="\n".join(tail))
+
+
+def _run_tests(python_exe, deadline: Deadline) -> None:
+    """Lance les tests du projet dans le venv (résultat non bloquant)."""
+    subprocess.run(
+        # Sortie non affichée : pas de -v, et pas de cache .pytest_cache à écrire
+        [python_exe, "-m", "pytest", "tests/", "--tb=line", "-q", "-p", "no:cacheprovider"],
+        cwd=str(PROJECT_ROOT),
+        capture_output=True,
+        timeout=deadline.remaining(),
+        **SUBPROCESS_KW,
+    )
 
-        # Étape 6 : tests optionnels
-        steps_queue.put((5, STEPS[5][0], 95))
-        if run_tests:
-            subprocess.run(
-                [python_exe, "-m", "pytest", "tests/", "-v", "--tb=line", "-q"],
-                cwd=str(PROJECT_ROOT),
-                capture_output=True,
-                timeout=120,
-                **SUBPROCESS_KW,
+
+def run_install(steps_queue: queue.Queue, run_tests: bool) -> None:
+    """Exécute l'installation dans un thread. Envoie (step_index, label, progress_pct) ou (None, error_msg, -1)."""
+    try:
+        python_cmd = find_python()
+        if not python_cmd:
+            steps_queue.put((None, "Python 3.11 ou supérieur est requis.", -1))
+            return
+        python_exe = str(VENV_PATH / "Scripts" / "python.exe")
+        deadline = Deadline(INSTALL_TIMEOUT)
+
+        # Copie de la config et détection des prérequis : indépendantes de pip,
+        # exécutées en parallèle pendant la création du venv et l'installation des dépendances.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            config_fut = pool.submit(_copy_config_example)
+            prereq_fut = pool.submit(_probe_prereqs)
+
+            def check_prereqs():
+                # Informatif, pas bloquant
+                missing = prereq_fut.result(timeout=30)
+                if missing:
+                    step = STEPS[4]
+                    steps_queue.put((4, step.label + " Introuvable(s) : " + ", ".join(missing), step.pct))
+
+            # Une action par étape de STEPS (même ordre)
+            dispatch = (
+                lambda: None,  # Python : déjà vérifié par find_python
+                lambda: _create_venv(python_cmd, deadline),
+                lambda: _install_dependencies(python_exe, steps_queue, deadline),
+                lambda: config_fut.result(timeout=30),  # config déjà copiée en tâche de fond
+                check_prereqs,
+                lambda: _run_tests(python_exe, deadline) if run_tests else None,
             )
+            for i, step in enumerate(STEPS):
+                steps_queue.put((i, step.label, step.pct))
+                dispatch[i]()
 
         steps_queue.put((len(STEPS), "Installation terminée.", 100))
     except subprocess.CalledProcessError as e:
-        err = e.stderr.decode("utf-8", errors="replace") if e.stderr else str(e)
-        steps_queue.put((None, f"Erreur lors de l'installation : {err[:200]}", -1))
+        err = e.stderr or str(e)
+        if isinstance(err, bytes):
+            err = err.decode("utf-8", errors="replace")
+        steps_queue.put((None, f"Erreur lors de l'installation : {err[-200:]}", -1))
     except Exception as e:
         steps_queue.put((None, f"Erreur : {e}", -1))
 
@@ -263,6 +519,7 @@ class InstallerWindow:
     """Fenêtre principale de l'installateur."""
 
     def __init__(self):
+        _load_tkinter()
         self.root = tk.Tk()
         self.root.title("BASIC Scanner - Installation")
         self.root.resizable(False, False)
@@ -321,28 +578,32 @@ class InstallerWindow:
 
     def _poll_queue(self):
         """Lit la file des mises à jour et met à jour l'interface (appelé depuis le thread principal)."""
-        try:
-            while True:
-                msg = self.steps_queue.get_nowait()
-                step_index, label, progress = msg
-                if step_index is None:
-                    self.error_msg = label
-                    self.progress["value"] = 0
-                    self.status_var.set(f"Échec : {label[:80]}")
-                    self.install_done = True
-                    self.close_btn["state"] = tk.NORMAL
-                    messagebox.showerror("Installation échouée", label, parent=self.root)
-                    return
-                self.status_var.set(label)
-                self.progress["value"] = progress
-                if progress >= 100:
-                    self.install_done = True
-                    self.progress["value"] = 100
-                    self._show_finish_in_same_window()
-                    return
-        except queue.Empty:
-            pass
-        self.root.after(200, self._poll_queue)
+        # Vider la file d'un coup (un seul verrou) plutôt que get_nowait en boucle
+        with self.steps_queue.mutex:
+            batch = list(self.steps_queue.queue)
+            self.steps_queue.queue.clear()
+        last_progress = None
+        for step_index, label, progress in batch:
+            if step_index is None:
+                self.error_msg = label
+                self.progress["value"] = 0
+                self.status_var.set(f"Échec : {label[:80]}")
+                self.install_done = True
+                self.close_btn["state"] = tk.NORMAL
+                messagebox.showerror("Installation échouée", label, parent=self.root)
+                return
+            self.status_var.set(label)
+            last_progress = progress
+            if progress >= 100:
+                self.install_done = True
+                self.progress["value"] = 100
+                self._show_finish_in_same_window()
+                return
+        # Redessiner la barre une seule fois par lot
+        if last_progress is not None:
+            self.progress["value"] = last_progress
+        # Événements reçus : d'autres suivent souvent de près ; sinon, sonder moins souvent
+        self.root.after(50 if batch else 500, self._poll_queue)
 
     def _show_finish_in_same_window(self):
         """Affiche les options (raccourci, lancer, fermer) dans la même fenêtre."""
@@ -369,8 +630,11 @@ class InstallerWindow:
             messagebox.showwarning("Raccourci", f"Impossible de créer le raccourci : {msg}", parent=self.root)
 
     def _do_launch_ui(self):
-        if launch_ui_no_console():
-            messagebox.showinfo("Lancement", "L'interface a été lancée.", parent=self.root)
+        # Installation terminée : l'installateur est remplacé par l'interface (pas de processus parent).
+        # execv ne revient qu'en cas d'échec ; la fenêtre n'est fermée qu'une fois l'interface lancée,
+        # pour afficher l'avertissement dans l'installateur (sans racine Tk fantôme)
+        if exec_ui_replacing_process() or launch_ui_no_console():
+            self.root.destroy()
         else:
             messagebox.showwarning("Lancement", "Impossible de lancer l'interface.", parent=self.root)
 
@@ -393,6 +657,11 @@ class InstallerWindow:
 
 
 def main():
+    try:
+        _load_tkinter()
+    except ImportError:
+        print("Erreur : tkinter est requis. Installez Python avec les composants optionnels (tcl/tk).")
+        sys.exit(1)
     os.chdir(PROJECT_ROOT)
     app = InstallerWindow()
     app.run()
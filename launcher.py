@@ -4,12 +4,39 @@ Point d'entrée unique pour l'exécutable BASIC Scanner (PyInstaller).
 - Avec l'argument "run" : lance la surveillance (basic_scanner run).
 Permet un seul .exe pour l'interface et le watcher.
 """
+import multiprocessing
 import os
+import shutil
 import sys
 from pathlib import Path
 
 
+def _bootstrap_config(config_yaml: Path) -> None:
+    """
+    Crée config.yaml à partir de l'exemple embarqué s'il n'existe pas encore.
+    Cas courant (config déjà présente) : un seul stat. Copie atomique (fichier temporaire + os.replace)
+    pour ne jamais laisser une config à moitié écrite.
+    """
+    try:
+        os.stat(config_yaml)
+        return
+    except FileNotFoundError:
+        pass
+    config_yaml.parent.mkdir(parents=True, exist_ok=True)
+    _meipass = getattr(sys, "_MEIPASS", "")
+    if not _meipass:
+        return
+    example = Path(_meipass) / "config.example.yaml"
+    if example.is_file():
+        tmp = config_yaml.with_name(config_yaml.name + ".tmp")
+        shutil.copy2(example, tmp)
+        os.replace(tmp, config_yaml)
+
+
 def main():
+    # Exécutable figé : les processus OCR (pool spawn) relancent l'exe ; freeze_support les fait agir
+    # en worker au lieu de rouvrir l'interface graphique
+    multiprocessing.freeze_support()
     if getattr(sys, "frozen", False):
         # Mode exécutable (PyInstaller) : répertoire de base = dossier de l'exe
         base = Path(sys.executable).resolve().parent
@@ -26,15 +53,7 @@ def main():
             config_dir = Path.home() / "Library" / "Application Support" / "BASIC Scanner"
         else:
             config_dir = Path(os.environ.get("XDG_CONFIG_HOME", "") or str(Path.home() / ".config")) / "BASIC Scanner"
-        config_dir.mkdir(parents=True, exist_ok=True)
-        config_yaml = config_dir / "config.yaml"
-        if not config_yaml.is_file():
-            _meipass = Path(getattr(sys, "_MEIPASS", ""))
-            if _meipass:
-                example = _meipass / "config.example.yaml"
-                if example.is_file():
-                    import shutil
-                    shutil.copy2(example, config_yaml)
+        _bootstrap_config(config_dir / "config.yaml")
         if str(base) not in sys.path:
             sys.path.insert(0, str(base))
         import scan_gui
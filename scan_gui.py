@@ -3,11 +3,18 @@ BASIC Scanner - Interface graphique de visualisation.
 Affiche : dossier scanné (INBOX), racine cible, arborescence et fichiers.
 Lancer : python scan_gui.py  (depuis la racine du projet, avec venv activé)
 """
+import asyncio
+import functools
+import heapq
+import itertools
 import os
 import queue
 import subprocess
 import sys
 import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from pathlib import Path
 
 try:
@@ -21,16 +28,17 @@ except ImportError:
     sys.exit(1)
 
 # Racine du projet (dossier de l'exe en mode PyInstaller, sinon dossier du script)
+@functools.lru_cache(maxsize=1)
 def _project_root():
     if getattr(sys, "frozen", False):
         return Path(sys.executable).resolve().parent
     return Path(__file__).resolve().parent
 
 
+@functools.lru_cache(maxsize=1)
 def _config_default():
     """Chemin du fichier de config : dossier réservé en mode exe (invisible), sinon à la racine du projet."""
     if getattr(sys, "frozen", False):
-        import os
         if sys.platform == "win32":
             base = Path(os.environ.get("LOCALAPPDATA", "") or str(Path.home() / "AppData" / "Local")) / "BASIC Scanner"
         elif sys.platform == "darwin":
@@ -47,6 +55,12 @@ CONFIG_DEFAULT = _config_default()
 # Limite d'éléments pour éviter blocage (arborescence)
 MAX_TREE_NODES = 5000
 MAX_DEPTH = 15
+# Durée de validité (s) d'un scan de dossier mis en cache, en plus du contrôle de son mtime
+DIR_CACHE_TTL = 2.0
+# Lignes conservées par flux (stdout / stderr) pour le journal de la surveillance
+WATCHER_LOG_LINES = 5000
+# Profondeur scannée à chaque ouverture d'un dossier de la racine cible (0 = enfants directs seulement)
+LAZY_DEPTH = 0
 
 # Clés intégrées (placeholders) et leur description pour la fenêtre d'aide
 CLES_INTEGREES = [
@@ -62,89 +76,274 @@ CLES_INTEGREES = [
 ]
 
 
+@functools.lru_cache(maxsize=1)
+def _get_python_exe():
+    """Retourne le chemin du Python à utiliser (exe en mode frozen, sinon venv prioritaire). Résolu une seule fois."""
+    if getattr(sys, "frozen", False):
+        return sys.executable
+    if os.name == "nt":
+        venv_py = PROJECT_ROOT / ".venv" / "Scripts" / "python.exe"
+    else:
+        venv_py = PROJECT_ROOT / ".venv" / "bin" / "python"
+    if venv_py.exists():
+        return str(venv_py)
+    return sys.executable
+
+
+# Module config importé une seule fois (src/ ajouté au path hors mode exe) ; None si indisponible
+if not getattr(sys, "frozen", False) and str(PROJECT_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT / "src"))
+try:
+    from basic_scanner.config import load_config as _load_config, save_config as _save_config
+except Exception:
+    _load_config = _save_config = None
+
+
 def load_config_safe(path):
     """Charge la config sans lever d'exception (retourne None si erreur)."""
+    if _load_config is None:
+        return None
     try:
-        if not getattr(sys, "frozen", False) and str(PROJECT_ROOT / "src") not in sys.path:
-            sys.path.insert(0, str(PROJECT_ROOT / "src"))
-        from basic_scanner.config import load_config
-        return load_config(path)
+        return _load_config(path)
     except Exception:
         return None
 
 
 def save_config_safe(config, path):
     """Sauvegarde la config (retourne True/False)."""
+    if _save_config is None:
+        return False
     try:
-        if not getattr(sys, "frozen", False) and str(PROJECT_ROOT / "src") not in sys.path:
-            sys.path.insert(0, str(PROJECT_ROOT / "src"))
-        from basic_scanner.config import save_config
-        save_config(config, path)
+        _save_config(config, path)
         return True
     except Exception:
         return False
 
 
+def _sort_rows(it):
+    """
+    Lignes triables (0 dossier / 1 fichier, nom casefold, nom, entrée) pour les entrées de scandir.
+    Triées par list.sort() sans clé : comparaison de tuples en C, dossiers d'abord puis par nom ;
+    le nom exact départage deux noms égaux sans casse, l'entrée n'est donc jamais comparée.
+    """
+    return [(0 if e.is_dir(follow_symlinks=False) else 1, e.name.casefold(), e.name, e) for e in it]
+
+
+def _first_rows(rows, limit):
+    """Les limit premières lignes dans l'ordre de tri : sélection partielle si on tronque, pas de tri si 0 ou 1 ligne."""
+    if len(rows) > limit:
+        return heapq.nsmallest(limit, rows)
+    if len(rows) > 1:
+        rows.sort()
+    return rows
+
+
+class _DirCache:
+    """
+    Derniers scans de dossiers (LRU de maxsize entrées), partagés entre threads.
+    Un résultat est réutilisé si le mtime du dossier n'a pas changé et s'il a moins de ttl secondes :
+    le mtime d'un dossier change à chaque ajout / suppression / renommage d'une entrée directe.
+    """
+
+    def __init__(self, maxsize=64, ttl=DIR_CACHE_TTL):
+        self._data = OrderedDict()  # key -> (mtime_ns, instant du scan, résultat)
+        self._lock = threading.Lock()
+        self._maxsize = maxsize
+        self._ttl = ttl
+
+    def lookup(self, key, path, compute):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return compute()
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None and hit[0] == mtime and now - hit[1] < self._ttl:
+                self._data.move_to_end(key)
+                return hit[2]
+        result = compute()
+        with self._lock:
+            self._data[key] = (mtime, now, result)
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_dir_cache = _DirCache()
+
+
 def build_tree_entries(root_path, max_nodes=MAX_TREE_NODES, max_depth=MAX_DEPTH):
     """
     Construit la liste (parent_id, name, full_path, is_dir, node_id) pour le TreeView.
     node_id = numéro unique (string) pour éviter problèmes avec chemins dans iid.
     Retourne: list of (parent_id, name, full_path, is_dir, node_id), ordre BFS.
+    Parcours par os.scandir : le type (dossier/fichier) vient de l'entrée de répertoire, sans stat supplémentaire.
+    Un scan d'un seul niveau (max_depth=0) est mis en cache : le mtime du dossier suffit à le valider.
+    Lève FileNotFoundError / NotADirectoryError si root_path n'est pas un dossier existant.
     """
-    root_path = Path(root_path)
-    if not root_path.is_dir():
-        return []
-    root_str = str(root_path.resolve())
+    if max_depth > 0:
+        return _walk_tree(root_path, max_nodes, max_depth)
+    return _dir_cache.lookup(("tree", root_path, max_nodes), root_path, lambda: _walk_tree(root_path, max_nodes, 0))
+
+
+def _walk_tree(root_path, max_nodes, max_depth):
+    # abspath est purement textuel (realpath ferait un lstat par composant du chemin) ;
+    # l'existence de la racine est vérifiée par son propre scandir, sans stat préalable.
+    root_str = os.path.abspath(root_path)
     entries = []
     node_ids = {root_str: "0"}
-    try:
-        stack = [(root_str, 0)]  # (path, depth)
-        node_count = 1
-        while stack and node_count < max_nodes:
-            current_path, depth = stack.pop(0)
-            if depth > max_depth:
-                continue
-            try:
-                current = Path(current_path)
-            except Exception:
-                continue
-            # Id du répertoire courant (parent des enfants qu'on va ajouter)
-            parent_id = node_ids.get(current_path, "0")
-            try:
-                children = sorted(current.iterdir(), key=lambda p: (not p.is_dir(), p.name.lower()))
-                for child in children:
-                    if node_count >= max_nodes:
-                        break
-                    cid = str(node_count)
-                    node_ids[str(child)] = cid
-                    node_count += 1
-                    entries.append((parent_id, child.name, str(child), child.is_dir(), cid))
-                    if child.is_dir():
-                        stack.append((str(child), depth + 1))
-            except (PermissionError, OSError):
-                pass
-    except Exception:
-        pass
+    # Méthodes liées une fois : la boucle interne ne refait pas la recherche d'attribut à chaque entrée
+    add_entry = entries.append
+    stack = deque([(root_str, 0)])  # (path, depth), file FIFO du parcours en largeur
+    push = stack.append
+    node_count = 1
+    while stack and node_count < max_nodes:
+        current_path, depth = stack.popleft()
+        # Id du répertoire courant (parent des enfants qu'on va ajouter)
+        parent_id = node_ids.get(current_path, "0")
+        try:
+            with os.scandir(current_path) as it:
+                children = _sort_rows(it)
+        except (FileNotFoundError, NotADirectoryError):
+            if depth == 0:
+                raise  # racine absente : signalée à l'appelant, qui n'a pas à la tester avant
+            continue
+        except OSError:  # accès refusé, dossier supprimé entre-temps… : on saute ce dossier
+            if depth == 0:
+                return [], {}
+            continue
+        child_depth = depth + 1
+        # Les sous-dossiers au-delà de max_depth ne sont jamais mis en file
+        descend = child_depth <= max_depth
+        # Budget restant appliqué une fois par dossier plutôt que testé à chaque entrée
+        for kind, _, name, child in _first_rows(children, max_nodes - node_count):
+            child_path = child.path
+            cid = str(node_count)
+            node_ids[child_path] = cid
+            node_count += 1
+            is_dir = kind == 0
+            add_entry((parent_id, name, child_path, is_dir, cid))
+            if is_dir and descend:
+                push((child_path, child_depth))
     return entries, node_ids
 
 
 def list_dir_simple(path, max_files=2000):
-    """Liste (nom, chemin, is_dir) pour un dossier. Limité à max_files."""
-    path = Path(path)
-    if not path.is_dir():
-        return []
-    result = []
+    """
+    Liste (nom, chemin, is_dir) pour un dossier. Limité à max_files. Résultat récent réutilisé (_DirCache).
+    Retourne None si path n'est pas un dossier existant.
+    """
+    return _dir_cache.lookup(("list", path, max_files), path, lambda: _list_dir(path, max_files))
+
+
+def _list_dir(path, max_files):
     try:
-        for p in sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name.lower())):
-            if len(result) >= max_files:
-                result.append((f"... et plus ({max_files} max)", "", False))
-                break
-            result.append((p.name, str(p), p.is_dir()))
-    except (PermissionError, OSError):
-        result.append(("(accès refusé)", "", False))
+        with os.scandir(path) as it:
+            entries = _sort_rows(it)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    except OSError:
+        return [("(accès refusé)", "", False)]
+    result = [(name, e.path, kind == 0) for kind, _, name, e in _first_rows(entries, max_files)]
+    if len(entries) > max_files:
+        result.append((f"... et plus ({max_files} max)", "", False))
     return result
 
 
+def prepare_racine_rows(parent_iid, entries):
+    """
+    Prépare hors du thread Tk les lignes à insérer sous parent_iid pour les entrées de build_tree_entries :
+    (parent, iid, texte, chemin, dossier_à_déplier), dans l'ordre d'insertion.
+    iid = iid du parent + "/" + id relatif : unique dans l'arbre sans compteur partagé.
+    Ordre BFS : les enfants d'un même dossier sont contigus et leur parent les précède ; chaque fratrie
+    est émise de la fin vers le début, pour une insertion à l'index 0 (« end » parcourt toute la fratrie).
+    """
+    iid_by_nid = {"0": parent_iid}
+    scanned = {parent_id for parent_id, _, _, _, _ in entries}
+    rows = []
+    for parent_id, name, full_path, is_dir, nid in entries:
+        iid = f"{parent_iid}/{nid}"
+        iid_by_nid[nid] = iid
+        text = f"[D] {name}" if is_dir else name
+        rows.append((iid_by_nid.get(parent_id, parent_iid), iid, text, full_path, is_dir and nid not in scanned))
+    prepared = []
+    for _, siblings in itertools.groupby(rows, key=lambda row: row[0]):
+        prepared.extend(reversed(list(siblings)))
+    return prepared
+
+
+async def _drain_stream(stream, lines):
+    """Lit un flux ligne à ligne jusqu'à sa fermeture ; lines (deque bornée) garde les dernières."""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            continue  # ligne plus longue que la limite du lecteur : ignorée, la lecture continue
+        if not line:
+            return
+        lines.append(line)
+
+
+async def _supervise_watcher(proc):
+    """Lit stdout/stderr du processus de surveillance jusqu'à sa fin ; retourne (code, journal)."""
+    # Lecture continue des deux flux : mémoire bornée quelle que soit la durée de la surveillance
+    out_lines = deque(maxlen=WATCHER_LOG_LINES)
+    err_lines = deque(maxlen=WATCHER_LOG_LINES)
+    await asyncio.gather(_drain_stream(proc.stdout, out_lines), _drain_stream(proc.stderr, err_lines))
+    code = await proc.wait()
+    out_txt = b"".join(out_lines).decode("utf-8", errors="replace")
+    err_txt = b"".join(err_lines).decode("utf-8", errors="replace")
+    log = ""
+    if out_txt.strip():
+        log += "--- stdout ---\n" + out_txt.strip() + "\n"
+    if err_txt.strip():
+        log += "--- stderr ---\n" + err_txt.strip() + "\n"
+    if not log:
+        log = "(Aucune sortie capturée.)"
+    return code, log
+
+
+async def _stop_process(proc, timeout):
+    """Demande l'arrêt du processus, le tue s'il n'est pas sorti après timeout secondes."""
+    try:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _table_row(values):
+    """Valeurs d'une ligne de tableau normalisées une fois : str sans espaces autour (None -> "")."""
+    return tuple("" if v is None else str(v).strip() for v in values)
+
+
+def _clear_tree(tree):
+    """Vide un TreeView en un seul appel Tcl (delete accepte plusieurs iids)."""
+    children = tree.get_children()
+    if children:
+        tree.delete(*children)
+
+
+@contextmanager
+def _detached(tree, iid):
+    """Retire iid de l'affichage le temps d'insérer ses enfants en bloc, puis le remet à sa place."""
+    parent = tree.parent(iid)
+    index = tree.index(iid)
+    tree.detach(iid)
+    try:
+        yield
+    finally:
+        tree.move(iid, parent, index)
+
+
 class ScannerGUI:
     def __init__(self):
         self.root = tk.Tk()
@@ -155,6 +354,15 @@ class ScannerGUI:
         self.config_data = {}
         self.tree_queue = queue.Queue()
         self.inbox_queue = queue.Queue()
+        self._racine_generation = 0  # incrémenté à chaque rechargement : les scans en retard sont ignorés
+        self._files_path = None  # dossier dont la liste de fichiers est attendue
+        self._select_after_id = None  # sélection Racine en attente (anti-rebond)
+        self._table_values = {}  # tableau de config -> {iid: valeurs (str, sans espaces)}, copie Python des lignes
+        self._loop = None  # boucle asyncio (thread dédié) qui supervise le processus de surveillance
+        # Posé par un thread de scan qui a signalé des résultats, levé quand le thread Tk vide les files :
+        # une rafale de résultats ne génère qu'un événement, et rien ne tourne quand aucun scan n'est en cours
+        self._queues_signaled = threading.Event()
+        self.root.bind("<<QueuesReady>>", lambda e: self._drain_queues())
         self._build_ui()
         self._load_config_ui()
 
@@ -332,6 +540,7 @@ class ScannerGUI:
         scroll_racine.pack(side=tk.RIGHT, fill=tk.Y)
         self.racine_tree.configure(yscrollcommand=scroll_racine.set)
         self.racine_tree.bind("<<TreeviewSelect>>", self._on_racine_select)
+        self.racine_tree.bind("<<TreeviewOpen>>", self._on_racine_open)
 
         right_bottom = ttk.LabelFrame(right, text="Fichiers dans le dossier sélectionné", padding=4)
         right_bottom.pack(fill=tk.BOTH, expand=True, pady=(4, 0))
@@ -346,18 +555,6 @@ class ScannerGUI:
         self.label_racine_status = ttk.Label(right_top, text="Charger la config pour afficher l'arborescence.", foreground="gray")
         self.label_racine_status.pack(anchor=tk.W)
 
-    def _get_python_exe(self):
-        """Retourne le chemin du Python à utiliser (exe en mode frozen, sinon venv prioritaire)."""
-        if getattr(sys, "frozen", False):
-            return sys.executable
-        if os.name == "nt":
-            venv_py = PROJECT_ROOT / ".venv" / "Scripts" / "python.exe"
-        else:
-            venv_py = PROJECT_ROOT / ".venv" / "bin" / "python"
-        if venv_py.exists():
-            return str(venv_py)
-        return sys.executable
-
     def _draw_status_dot(self, state):
         """Dessine la pastille de couleur selon l'état (stopped=running=green, error=red)."""
         colors = {"stopped": "#9e9e9e", "running": "#2e7d32", "error": "#c62828"}
@@ -399,19 +596,28 @@ class ScannerGUI:
         text.insert(tk.END, log)
         text.config(state=tk.DISABLED)
 
+    def _watcher_loop(self):
+        """Boucle asyncio du superviseur, démarrée dans son thread au premier lancement."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return self._loop
+
+    def _stop_watcher_process(self, timeout):
+        """Arrête le processus de surveillance (terminate, puis kill après timeout secondes)."""
+        proc, self._watcher_process = self._watcher_process, None
+        if proc is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(_stop_process(proc, timeout), self._loop).result(timeout + 2)
+        except Exception:
+            pass
+
     def _toggle_watcher(self):
         """Lance ou arrête la surveillance du dossier INBOX."""
         if self._watcher_process is not None:
             self._watcher_stopped_by_user = True
-            try:
-                self._watcher_process.terminate()
-                self._watcher_process.wait(timeout=5)
-            except Exception:
-                try:
-                    self._watcher_process.kill()
-                except Exception:
-                    pass
-            self._watcher_process = None
+            self._stop_watcher_process(timeout=5)
             self._update_watcher_status("stopped", "Surveillance arrêtée.")
             self.btn_watcher.config(text="Lancer la surveillance")
             return
@@ -427,7 +633,7 @@ class ScannerGUI:
             )
             return
         self._watcher_stopped_by_user = False
-        python_exe = self._get_python_exe()
+        python_exe = _get_python_exe()
         if getattr(sys, "frozen", False):
             cmd = [python_exe, "run", "--config", str(path)]
         else:
@@ -440,8 +646,9 @@ class ScannerGUI:
         }
         if sys.platform == "win32":
             kwargs["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000)
+        loop = self._watcher_loop()
         try:
-            self._watcher_process = subprocess.Popen(cmd, **kwargs)
+            proc = asyncio.run_coroutine_threadsafe(asyncio.create_subprocess_exec(*cmd, **kwargs), loop).result(timeout=30)
         except Exception as e:
             self._watcher_log = f"Impossible de lancer le processus :\n{e}"
             self._update_watcher_status("error", f"Erreur au lancement : {e}")
@@ -455,30 +662,25 @@ class ScannerGUI:
         self.btn_watcher.config(text="Arrêter la surveillance")
         self._update_watcher_status("running", "Surveillance en cours — les PDF déposés dans l'INBOX seront triés.")
 
-        def watcher_worker(proc):
+        self._watcher_process = proc
+
+        def on_done(fut):
+            # Appelé dans le thread asyncio : on repasse dans le thread Tk
+            try:
+                code, log = fut.result()
+            except Exception as e:
+                code, log = -1, f"Erreur de supervision :\n{e}"
             try:
-                stdout, stderr = proc.communicate(timeout=86400 * 365)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-                stdout, stderr = proc.communicate()
-            except Exception:
-                stdout, stderr = b"", b""
-            code = proc.returncode
-            out_txt = (stdout or b"").decode("utf-8", errors="replace")
-            err_txt = (stderr or b"").decode("utf-8", errors="replace")
-            log = ""
-            if out_txt.strip():
-                log += "--- stdout ---\n" + out_txt.strip() + "\n"
-            if err_txt.strip():
-                log += "--- stderr ---\n" + err_txt.strip() + "\n"
-            if not log:
-                log = "(Aucune sortie capturée.)"
-            self.root.after(0, lambda: self._on_watcher_exited(code, log, self._watcher_stopped_by_user))
-
-        threading.Thread(target=watcher_worker, args=(self._watcher_process,), daemon=True).start()
-
-    def _on_watcher_exited(self, returncode, log, stopped_by_user):
+                self.root.after(0, lambda: self._on_watcher_exited(proc, code, log, self._watcher_stopped_by_user))
+            except (RuntimeError, tk.TclError):
+                pass  # fenêtre déjà fermée
+
+        asyncio.run_coroutine_threadsafe(_supervise_watcher(proc), loop).add_done_callback(on_done)
+
+    def _on_watcher_exited(self, proc, returncode, log, stopped_by_user):
         """Appelé quand le processus de surveillance s'arrête."""
+        if self._watcher_process is not None and self._watcher_process is not proc:
+            return  # fin d'un ancien processus alors qu'une nouvelle surveillance tourne déjà
         self._watcher_process = None
         self._watcher_log = log
         try:
@@ -494,6 +696,27 @@ class ScannerGUI:
         except tk.TclError:
             pass
 
+    def _table_insert(self, tree, values):
+        """Ajoute une ligne à un tableau de config et à sa copie Python."""
+        iid = tree.insert("", tk.END, values=values)
+        self._table_values.setdefault(tree, {})[iid] = _table_row(values)
+        return iid
+
+    def _table_delete(self, tree, iids):
+        tree.delete(*iids)
+        rows = self._table_values.get(tree, {})
+        for iid in iids:
+            rows.pop(iid, None)
+
+    def _table_clear(self, tree):
+        _clear_tree(tree)
+        self._table_values[tree] = {}
+
+    def _table_rows(self, tree):
+        """Lignes d'un tableau de config dans l'ordre affiché (un seul appel Tcl : get_children)."""
+        rows = self._table_values.get(tree, {})
+        return [rows[iid] for iid in tree.get_children() if iid in rows]
+
     def _edit_tree_cell(self, tree, column_keys, event):
         """Ouvre une boîte de dialogue pour éditer la cellule cliquée (double-clic)."""
         region = tree.identify_region(event.x, event.y)
@@ -511,7 +734,7 @@ class ScannerGUI:
         item = tree.identify_row(event.y)
         if not item:
             return
-        values = list(tree.item(item, "values"))
+        values = list(self._table_values.get(tree, {}).get(item) or tree.item(item, "values"))
         if col_idx > len(values):
             return
         current = values[col_idx - 1]
@@ -520,6 +743,7 @@ class ScannerGUI:
         if new_val is not None:
             values[col_idx - 1] = new_val
             tree.item(item, values=values)
+            self._table_values.setdefault(tree, {})[item] = _table_row(values)
 
     def _ask_edit_string(self, title, initial_value, parent=None):
         """Ouvre une petite fenêtre avec un champ de saisie ; retourne la valeur ou None si annulé."""
@@ -557,23 +781,23 @@ class ScannerGUI:
         return result[0]
 
     def _add_regle_row(self):
-        self.regles_tree.insert("", tk.END, values=("facture_fournisseur", "Factures_fournisseurs/{fournisseur}/{YYYY}/{MM}", "{YYYY}-{MM}-{DD}_{type_doc}_{fournisseur}_{numero}.pdf"))
+        self._table_insert(self.regles_tree, ("facture_fournisseur", "Factures_fournisseurs/{fournisseur}/{YYYY}/{MM}", "{YYYY}-{MM}-{DD}_{type_doc}_{fournisseur}_{numero}.pdf"))
 
     def _remove_regle_row(self):
         sel = self.regles_tree.selection()
-        for i in sel:
-            self.regles_tree.delete(i)
+        if sel:
+            self._table_delete(self.regles_tree, sel)
 
     def _add_format_row(self):
-        self.formats_tree.insert("", tk.END, values=("ex: A_CLASSER", "{timestamp}_A_CLASSER_{original}.pdf"))
+        self._table_insert(self.formats_tree, ("ex: A_CLASSER", "{timestamp}_A_CLASSER_{original}.pdf"))
 
     def _remove_format_row(self):
         sel = self.formats_tree.selection()
-        for i in sel:
-            self.formats_tree.delete(i)
+        if sel:
+            self._table_delete(self.formats_tree, sel)
 
     def _add_fourn_row(self):
-        self.fourn_tree.insert("", tk.END, values=("", ""))
+        self._table_insert(self.fourn_tree, ("", ""))
 
     def _add_cle_row(self):
         """Ajoute une clé personnalisée (dialogue pour clé, description, valeur par défaut)."""
@@ -585,12 +809,12 @@ class ScannerGUI:
             return
         description = self._ask_edit_string("Nouvelle clé — description / utilité", "", parent=self.root) or ""
         valeur = self._ask_edit_string("Nouvelle clé — valeur par défaut", "", parent=self.root) or ""
-        self.cles_tree.insert("", tk.END, values=(cle, description, valeur))
+        self._table_insert(self.cles_tree, (cle, description, valeur))
 
     def _remove_cle_row(self):
         sel = self.cles_tree.selection()
-        for i in sel:
-            self.cles_tree.delete(i)
+        if sel:
+            self._table_delete(self.cles_tree, sel)
 
     def _show_cles_help(self):
         """Affiche une fenêtre d'aide listant les clés utilisables et leur utilité."""
@@ -609,10 +833,9 @@ class ScannerGUI:
         for cle, desc in CLES_INTEGREES:
             text.insert(tk.END, f"  {{{cle}}}\n    → {desc}\n")
         custom = []
-        for i in self.cles_tree.get_children():
-            v = self.cles_tree.item(i, "values")
-            if len(v) >= 3 and (v[0] or "").strip():
-                custom.append((v[0].strip(), v[1].strip() or "(sans description)", v[2].strip()))
+        for v in self._table_rows(self.cles_tree):
+            if len(v) >= 3 and v[0]:
+                custom.append((v[0], v[1] or "(sans description)", v[2]))
         if custom:
             text.insert(tk.END, "\nClés personnalisées (définies dans l'onglet Clés) :\n")
             for cle, desc, val in custom:
@@ -622,12 +845,12 @@ class ScannerGUI:
         ttk.Button(f, text="Fermer", command=win.destroy).pack(pady=(4, 0))
 
     def _add_fourn_row(self):
-        self.fourn_tree.insert("", tk.END, values=("", ""))
+        self._table_insert(self.fourn_tree, ("", ""))
 
     def _remove_fourn_row(self):
         sel = self.fourn_tree.selection()
-        for i in sel:
-            self.fourn_tree.delete(i)
+        if sel:
+            self._table_delete(self.fourn_tree, sel)
 
     def _browse_config(self):
         p = filedialog.askopenfilename(
@@ -665,132 +888,187 @@ class ScannerGUI:
         self.config_data = cfg
         self.var_inbox.set(cfg.get("inbox", ""))
         self.var_racine.set(cfg.get("racine_destination", ""))
-        for i in self.regles_tree.get_children():
-            self.regles_tree.delete(i)
+        self._table_clear(self.regles_tree)
         regles = cfg.get("regles_classement") or []
         if not regles and (cfg.get("modele_chemin") or cfg.get("modele_nom_fichier")):
             regles = [{"type": "facture_fournisseur", "modele_chemin": cfg.get("modele_chemin", ""), "modele_nom_fichier": cfg.get("modele_nom_fichier", "")}]
         for r in regles:
-            self.regles_tree.insert("", tk.END, values=(r.get("type", ""), r.get("modele_chemin", ""), r.get("modele_nom_fichier", "")))
+            self._table_insert(self.regles_tree, (r.get("type", ""), r.get("modele_chemin", ""), r.get("modele_nom_fichier", "")))
         if not regles:
-            self.regles_tree.insert("", tk.END, values=("facture_fournisseur", "Factures_fournisseurs/{fournisseur}/{YYYY}/{MM}", "{YYYY}-{MM}-{DD}_{type_doc}_{fournisseur}_{numero}.pdf"))
-            self.regles_tree.insert("", tk.END, values=("défaut", "Divers/{YYYY}/{MM}", "{YYYY}-{MM}-{DD}_{type_doc}.pdf"))
-        for i in self.formats_tree.get_children():
-            self.formats_tree.delete(i)
+            self._table_insert(self.regles_tree, ("facture_fournisseur", "Factures_fournisseurs/{fournisseur}/{YYYY}/{MM}", "{YYYY}-{MM}-{DD}_{type_doc}_{fournisseur}_{numero}.pdf"))
+            self._table_insert(self.regles_tree, ("défaut", "Divers/{YYYY}/{MM}", "{YYYY}-{MM}-{DD}_{type_doc}.pdf"))
+        self._table_clear(self.formats_tree)
         for motif, fmt in (cfg.get("formats_par_dossier") or {}).items():
-            self.formats_tree.insert("", tk.END, values=(motif, fmt))
-        for i in self.fourn_tree.get_children():
-            self.fourn_tree.delete(i)
+            self._table_insert(self.formats_tree, (motif, fmt))
+        self._table_clear(self.fourn_tree)
         for alias, nom in (cfg.get("mapping_fournisseurs") or {}).items():
-            self.fourn_tree.insert("", tk.END, values=(alias, nom))
-        for i in self.cles_tree.get_children():
-            self.cles_tree.delete(i)
+            self._table_insert(self.fourn_tree, (alias, nom))
+        self._table_clear(self.cles_tree)
         for item in (cfg.get("cles_personnalisees") or []):
             if isinstance(item, dict):
                 cle = item.get("cle", "").strip()
                 if cle:
-                    self.cles_tree.insert("", tk.END, values=(cle, item.get("description", ""), item.get("valeur_par_defaut", "")))
+                    self._table_insert(self.cles_tree, (cle, item.get("description", ""), item.get("valeur_par_defaut", "")))
             elif isinstance(item, (list, tuple)) and len(item) >= 2:
                 cle = str(item[0]).strip()
                 if cle:
-                    self.cles_tree.insert("", tk.END, values=(cle, item[1] if len(item) > 2 else "", item[2] if len(item) > 2 else ""))
+                    self._table_insert(self.cles_tree, (cle, item[1] if len(item) > 2 else "", item[2] if len(item) > 2 else ""))
+        _dir_cache.clear()  # rechargement explicite : rescanner les dossiers
         self.label_inbox_status.config(text="Chargement du contenu INBOX…")
         self.label_racine_status.config(text="Chargement de l'arborescence…")
-        threading.Thread(target=self._thread_load_inbox, daemon=True).start()
-        threading.Thread(target=self._thread_load_racine, daemon=True).start()
-        self.root.after(100, self._poll_queues)
-
-    def _thread_load_inbox(self):
-        inbox = self.var_inbox.get().strip()
-        if not inbox or not Path(inbox).is_dir():
-            self.inbox_queue.put(("done", [], None))
+        threading.Thread(target=self._thread_load_inbox, args=(self.var_inbox.get().strip(),), daemon=True).start()
+        threading.Thread(target=self._thread_load_racine, args=(self.var_racine.get().strip(),), daemon=True).start()
+
+    def _thread_load_inbox(self, inbox):
+        # Pas de isdir préalable : le scandir de list_dir_simple signale lui-même un dossier absent (None)
+        entries = list_dir_simple(inbox) if inbox else None
+        if entries is None:
+            self._post(self.inbox_queue, ("done", [], None))
             return
-        entries = list_dir_simple(inbox)
-        self.inbox_queue.put(("done", entries, inbox))
+        self._post(self.inbox_queue, ("done", entries, inbox))
 
-    def _thread_load_racine(self):
-        racine = self.var_racine.get().strip()
-        if not racine or not Path(racine).is_dir():
-            self.tree_queue.put(("done", [], None, {}))
+    def _thread_load_racine(self, racine):
+        if not racine:
+            self._post(self.tree_queue, ("done", [], None))
             return
         try:
-            entries, node_ids = build_tree_entries(racine)
-            self.tree_queue.put(("done", entries, racine, node_ids))
+            entries, _ = build_tree_entries(racine, max_depth=LAZY_DEPTH)
+            self._post(self.tree_queue, ("done", prepare_racine_rows("0", entries), racine))
+        except (FileNotFoundError, NotADirectoryError):  # levée par le scandir de la racine, sans isdir préalable
+            self._post(self.tree_queue, ("done", [], None))
         except Exception:
-            self.tree_queue.put(("done", [], racine, {}))
+            self._post(self.tree_queue, ("done", [], racine))
 
-    def _poll_queues(self):
+    def _thread_load_children(self, generation, iid, path):
+        try:
+            entries, _ = build_tree_entries(path, max_depth=LAZY_DEPTH)
+            rows = prepare_racine_rows(iid, entries)
+        except Exception:
+            rows = []
+        self._post(self.tree_queue, ("children", generation, rows))
+
+    def _thread_list_files(self, path):
+        self._post(self.tree_queue, ("files", path, list_dir_simple(path) or []))
+
+    def _post(self, q, msg):
+        """Depuis un thread de scan : dépose msg et réveille le thread Tk (un événement par rafale)."""
+        q.put(msg)
+        if self._queues_signaled.is_set():
+            return
+        self._queues_signaled.set()
+        try:
+            self.root.event_generate("<<QueuesReady>>", when="tail")
+        except (RuntimeError, tk.TclError):
+            # Fenêtre fermée ou boucle Tk pas encore lancée : aucun événement en route, ne pas bloquer
+            # les dépôts suivants derrière un drapeau resté levé
+            self._queues_signaled.clear()
+
+    def _drain_queues(self):
+        """Applique dans le thread Tk les résultats des scans faits en arrière-plan."""
+        # Levé avant de vider : un résultat déposé pendant la vidange redéclenche un événement
+        self._queues_signaled.clear()
         try:
             while True:
                 msg = self.inbox_queue.get_nowait()
                 if msg[0] == "done":
                     _, entries, path = msg
                     self._fill_inbox_tree(entries, path)
-                break
         except queue.Empty:
             pass
         try:
             while True:
                 msg = self.tree_queue.get_nowait()
                 if msg[0] == "done":
-                    _, entries, path, node_ids = msg if len(msg) == 4 else (msg[0], msg[1], msg[2], {})
-                    self._fill_racine_tree(entries, path, node_ids)
-                break
+                    _, rows, path = msg
+                    self._fill_racine_tree(rows, path)
+                elif msg[0] == "children":
+                    _, generation, rows = msg
+                    if generation == self._racine_generation:
+                        self._insert_racine_rows(rows)
+                elif msg[0] == "files":
+                    _, path, files = msg
+                    if path == self._files_path:
+                        self._fill_file_list(path, files)
         except queue.Empty:
             pass
-        self.root.after(200, self._poll_queues)
 
     def _fill_inbox_tree(self, entries, path):
-        for i in self.inbox_tree.get_children():
-            self.inbox_tree.delete(i)
+        _clear_tree(self.inbox_tree)
         if not path:
             self.label_inbox_status.config(text="Aucun dossier INBOX configuré.")
             return
-        root_name = Path(path).name or path
+        root_name = os.path.basename(os.path.normpath(path)) or path
         self.inbox_tree.insert("", "end", iid="inbox_root", text=root_name, values=(), open=True)
-        for idx, (name, full_path, is_dir) in enumerate(entries):
-            if name.startswith("..."):
-                self.inbox_tree.insert("inbox_root", "end", iid=f"inbox_{idx}", text=name, values=())
-                continue
-            icon = "[D] " if is_dir else ""
-            try:
-                self.inbox_tree.insert("inbox_root", "end", iid=f"inbox_{idx}", text=f"{icon}{name}", values=(full_path,))
-            except tk.TclError:
-                pass
+        with _detached(self.inbox_tree, "inbox_root"):
+            # Insertion à l'index 0 en partant de la fin : « end » parcourt toute la liste des frères à chaque insert.
+            # Les iid « inbox_<index> » sont uniques dans l'arbre vidé : pas de TclError à intercepter.
+            for idx in range(len(entries) - 1, -1, -1):
+                name, full_path, is_dir = entries[idx]
+                if name.startswith("..."):
+                    self.inbox_tree.insert("inbox_root", 0, iid=f"inbox_{idx}", text=name, values=())
+                    continue
+                icon = "[D] " if is_dir else ""
+                self.inbox_tree.insert("inbox_root", 0, iid=f"inbox_{idx}", text=f"{icon}{name}", values=(full_path,))
         self.label_inbox_status.config(text=f"Dossier scanné (INBOX) : {path} — {len(entries)} élément(s)")
 
-    def _fill_racine_tree(self, entries, path, node_ids=None):
-        for i in self.racine_tree.get_children():
-            self.racine_tree.delete(i)
+    def _fill_racine_tree(self, rows, path):
+        self._racine_generation += 1
+        _clear_tree(self.racine_tree)
         if not path:
             self.label_racine_status.config(text="Aucune racine cible configurée.")
             return
-        node_ids = node_ids or {}
-        path = str(Path(path).resolve())
-        root_name = Path(path).name or path
+        path = os.path.abspath(path)
+        root_name = os.path.basename(path) or path
         self._racine_path_by_iid = {"0": path}
+        self._racine_stubs = {}
         self.racine_tree.insert("", "end", iid="0", text=root_name, values=(), open=True)
-        # Construire map id -> (name, full_path, is_dir) pour chaque entrée
-        by_id = {}
-        for parent_id, name, full_path, is_dir, nid in entries:
-            by_id[nid] = (parent_id, name, full_path, is_dir)
-        # Map path -> id pour retrouver l'id à partir du chemin
-        # Insérer dans l'ordre des ids pour que le parent soit toujours déjà présent
-        for nid in sorted(by_id.keys(), key=lambda x: int(x) if x.isdigit() else 0):
-            parent_id, name, full_path, is_dir = by_id[nid]
-            self._racine_path_by_iid[nid] = full_path
-            icon = "[D] " if is_dir else ""
-            try:
-                self.racine_tree.insert(parent_id, "end", iid=nid, text=f"{icon}{name}", values=(full_path,))
-            except tk.TclError:
-                pass
-        total = len(entries) + 1
+        with _detached(self.racine_tree, "0"):
+            self._insert_racine_rows(rows)
+        total = len(rows) + 1
         self.label_racine_status.config(text=f"Racine cible : {path} — {total} nœud(s)")
 
+    def _insert_racine_rows(self, rows):
+        """
+        Insère les lignes préparées par prepare_racine_rows (aucun formatage ni tri dans le thread Tk).
+        Chaque dossier non encore parcouru reçoit un enfant factice « … » : il sera rempli à l'ouverture.
+        Les lignes dont l'iid existe déjà ou dont le parent est absent sont écartées par deux recherches
+        dans _racine_path_by_iid (un parent précède toujours ses enfants) : insert ne peut plus lever TclError.
+        """
+        known = self._racine_path_by_iid
+        insert = self.racine_tree.insert
+        for parent, iid, text, full_path, lazy in rows:
+            if iid in known or parent not in known:
+                continue
+            insert(parent, 0, iid=iid, text=text, values=(full_path,))
+            known[iid] = full_path
+            if lazy:
+                stub = f"{iid}_stub"
+                insert(iid, 0, iid=stub, text="…")
+                self._racine_stubs[iid] = stub
+
+    def _on_racine_open(self, event):
+        """Remplit un dossier de la racine cible à sa première ouverture."""
+        iid = self.racine_tree.focus()
+        stub = getattr(self, "_racine_stubs", {}).pop(iid, None)
+        if stub is None:
+            return
+        self.racine_tree.delete(stub)
+        path = self._racine_path_by_iid.get(iid)
+        if not path:
+            return
+        threading.Thread(target=self._thread_load_children, args=(self._racine_generation, iid, path), daemon=True).start()
+
     def _on_inbox_select(self, event):
         pass  # optionnel : afficher infos du fichier sélectionné
 
     def _on_racine_select(self, event):
+        # Anti-rebond : flèches maintenues = une seule lecture de dossier, 150 ms après la dernière sélection
+        if self._select_after_id is not None:
+            self.root.after_cancel(self._select_after_id)
+        self._select_after_id = self.root.after(150, self._do_racine_select)
+
+    def _do_racine_select(self):
+        self._select_after_id = None
         sel = self.racine_tree.selection()
         if not sel:
             return
@@ -798,18 +1076,20 @@ class ScannerGUI:
         path = getattr(self, "_racine_path_by_iid", {}).get(iid)
         if not path:
             return
-        p = Path(path)
-        if not p.is_dir():
+        if not os.path.isdir(path):
+            self._files_path = None
             self.file_list.delete(0, tk.END)
-            self.file_list.insert(tk.END, p.name)
+            self.file_list.insert(tk.END, os.path.basename(path))
             self.label_file_status.config(text=f"Fichier : {path}")
             return
         self.label_file_status.config(text=f"Chargement de {path}…")
-        files = list_dir_simple(path)
+        self._files_path = path
+        threading.Thread(target=self._thread_list_files, args=(path,), daemon=True).start()
+
+    def _fill_file_list(self, path, files):
         self.file_list.delete(0, tk.END)
-        for name, full_path, is_dir in files:
-            prefix = "[D] " if is_dir else "    "
-            self.file_list.insert(tk.END, f"{prefix}{name}")
+        # Un seul appel Tcl pour toute la liste (jusqu'à 2000 lignes) au lieu d'un insert par ligne
+        self.file_list.insert(tk.END, *[f"{'[D] ' if is_dir else '    '}{name}" for name, _, is_dir in files])
         self.label_file_status.config(text=f"{path} — {len(files)} élément(s)")
 
     def _save_config(self):
@@ -824,31 +1104,28 @@ class ScannerGUI:
         cfg["dossier_a_classer"] = "A_CLASSER"
         cfg["dossier_failed"] = "FAILED"
         regles = []
-        for i in self.regles_tree.get_children():
-            v = self.regles_tree.item(i, "values")
-            if len(v) >= 3 and (v[0].strip() or v[1].strip()):
-                regles.append({"type": v[0].strip() or "défaut", "modele_chemin": v[1].strip(), "modele_nom_fichier": v[2].strip()})
+        # Valeurs lues dans la copie Python des tableaux (déjà en str, sans espaces) : un seul appel Tcl par tableau
+        for v in self._table_rows(self.regles_tree):
+            if len(v) >= 3 and (v[0] or v[1]):
+                regles.append({"type": v[0] or "défaut", "modele_chemin": v[1], "modele_nom_fichier": v[2]})
         cfg["regles_classement"] = regles
         if regles:
             cfg["modele_chemin"] = regles[0].get("modele_chemin", "")
             cfg["modele_nom_fichier"] = regles[0].get("modele_nom_fichier", "")
         formats = {}
-        for i in self.formats_tree.get_children():
-            v = self.formats_tree.item(i, "values")
-            if len(v) >= 2 and v[0].strip():
-                formats[v[0].strip()] = v[1].strip()
+        for v in self._table_rows(self.formats_tree):
+            if len(v) >= 2 and v[0]:
+                formats[v[0]] = v[1]
         cfg["formats_par_dossier"] = formats
         mapping = {}
-        for i in self.fourn_tree.get_children():
-            v = self.fourn_tree.item(i, "values")
-            if len(v) >= 2 and v[0].strip():
-                mapping[v[0].strip()] = v[1].strip()
+        for v in self._table_rows(self.fourn_tree):
+            if len(v) >= 2 and v[0]:
+                mapping[v[0]] = v[1]
         cfg["mapping_fournisseurs"] = mapping
         cles_perso = []
-        for i in self.cles_tree.get_children():
-            v = self.cles_tree.item(i, "values")
-            if len(v) >= 1 and (v[0] or "").strip():
-                cles_perso.append({"cle": v[0].strip(), "description": (v[1] if len(v) > 1 else "").strip(), "valeur_par_defaut": (v[2] if len(v) > 2 else "").strip()})
+        for v in self._table_rows(self.cles_tree):
+            if len(v) >= 1 and v[0]:
+                cles_perso.append({"cle": v[0], "description": v[1] if len(v) > 1 else "", "valeur_par_defaut": v[2] if len(v) > 2 else ""})
         cfg["cles_personnalisees"] = cles_perso
         if save_config_safe(cfg, path):
             messagebox.showinfo("Sauvegarde", "Configuration enregistrée.", parent=self.root)
@@ -857,27 +1134,18 @@ class ScannerGUI:
 
     def _on_close(self):
         """Arrête la surveillance puis ferme la fenêtre."""
-        if self._watcher_process is not None:
-            try:
-                self._watcher_process.terminate()
-                self._watcher_process.wait(timeout=3)
-            except Exception:
-                try:
-                    self._watcher_process.kill()
-                except Exception:
-                    pass
-            self._watcher_process = None
+        self._stop_watcher_process(timeout=3)
         self.root.destroy()
 
     def run(self):
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Messages déposés par un scan avant l'entrée dans la boucle Tk (event_generate a échoué) : vidés au démarrage
+        self.root.after_idle(self._drain_queues)
         self.root.mainloop()
 
 
 def main():
     os.chdir(PROJECT_ROOT)
-    if not getattr(sys, "frozen", False) and str(PROJECT_ROOT / "src") not in sys.path:
-        sys.path.insert(0, str(PROJECT_ROOT / "src"))
     app = ScannerGUI()
     app.run()
 
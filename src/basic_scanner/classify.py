@@ -4,6 +4,17 @@ Confiance basée sur : fournisseur trouvé, date trouvée, type trouvé.
 """
 from basic_scanner.models import ExtractedData
 
+_TYPE_DOC_SLUGS = {
+    "facture_fournisseur": "FACT",
+    "avoir": "AVR",
+    "devis": "DEVIS",
+    "courrier": "COURRIER",
+    "plan": "PLAN",
+    "impots": "IMPOTS",
+}
+# Types reconnus (comptent dans la confiance) : test d'appartenance en O(1)
+_KNOWN_TYPES = frozenset(_TYPE_DOC_SLUGS)
+
 
 def compute_confidence(extracted: ExtractedData) -> float:
     """
@@ -20,7 +31,7 @@ def compute_confidence(extracted: ExtractedData) -> float:
     if extracted.date_doc:
         score += 0.25
     # Type document reconnu
-    if extracted.type_document in ("facture_fournisseur", "avoir", "devis", "courrier", "plan", "impots"):
+    if extracted.type_document in _KNOWN_TYPES:
         score += 0.2
     # Numéro facture
     if extracted.numero_facture:
@@ -32,25 +43,19 @@ def compute_confidence(extracted: ExtractedData) -> float:
     return min(1.0, round(score, 2))
 
 
-def ensure_type_doc(extracted: ExtractedData) -> None:
+def ensure_type_doc(extracted: ExtractedData) -> str:
     """
     Ajuste le type_document pour le chemin (slug) : FACT, AVR, DEVIS, COURRIER, PLAN, INCONNU.
-    Modifie extracted en place.
+    Modifie extracted en place et retourne le slug.
     """
-    slug_map = {
-        "facture_fournisseur": "FACT",
-        "avoir": "AVR",
-        "devis": "DEVIS",
-        "courrier": "COURRIER",
-        "plan": "PLAN",
-        "impots": "IMPOTS",
-    }
-    setattr(extracted, "_type_doc_slug", slug_map.get(extracted.type_document, "INCONNU"))
+    slug = _TYPE_DOC_SLUGS.get(extracted.type_document, "INCONNU")
+    extracted._type_doc_slug = slug
+    return slug
 
 
 def get_type_doc_slug(extracted: ExtractedData) -> str:
     """Retourne le libellé court pour le nom de fichier (FACT, AVR, INCONNU)."""
-    if hasattr(extracted, "_type_doc_slug"):
-        return getattr(extracted, "_type_doc_slug")
-    ensure_type_doc(extracted)
-    return getattr(extracted, "_type_doc_slug")
+    slug = extracted._type_doc_slug
+    if slug is not None:
+        return slug
+    return ensure_type_doc(extracted)
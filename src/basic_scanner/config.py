@@ -1,11 +1,23 @@
 """
 Chargement et validation de la configuration YAML.
 """
+import copy
+import functools
+import os
+import stat
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+# Parseur / émetteur LibYAML (C) si PyYAML a été compilé avec, sinon implémentation Python
+try:
+    from yaml import CSafeDumper as _Dumper, CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeDumper as _Dumper, SafeLoader as _Loader
+
+_DUMP_OPTIONS = {"Dumper": _Dumper, "allow_unicode": True, "default_flow_style": False, "sort_keys": False}
+
 
 def load_config(config_path: str | Path) -> dict[str, Any]:
     """
@@ -16,11 +28,27 @@ def load_config(config_path: str | Path) -> dict[str, Any]:
     :raises yaml.YAMLError: Si le YAML est invalide.
     """
     path = Path(config_path)
-    if not path.is_file():
+    try:
+        st = path.stat()
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise FileNotFoundError(f"Fichier de configuration introuvable: {path}")
 
+    # Copie profonde : l'appelant (GUI qui édite mapping / règles avant d'enregistrer) peut modifier
+    # listes et dictionnaires imbriqués sans toucher au résultat en cache ; le YAML n'est pas reparsé
+    return copy.deepcopy(_load_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size))
+
+
+@functools.lru_cache(maxsize=16)
+def _load_cached(path_str: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    """
+    Lit et normalise le fichier config. Mis en cache par (chemin absolu, mtime, taille) :
+    tant que le fichier n'est pas modifié, un rechargement ne relit ni ne reparse le YAML.
+    """
+    path = Path(path_str)
     with open(path, encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_Loader)
 
     if data is None:
         data = {}
@@ -35,29 +63,25 @@ def _normalize_config(data: dict[str, Any], config_dir: Path) -> dict[str, Any]:
     """
     out = dict(data)
 
-    # INBOX : peut être relatif au config ou absolu/UNC
-    inbox = out.get("inbox")
-    if inbox:
-        p = Path(inbox)
-        if not p.is_absolute():
-            p = (config_dir / p).resolve()
-        out["inbox"] = str(p)
-
-    # Racine destination
-    racine = out.get("racine_destination")
-    if racine:
-        p = Path(racine)
-        if not p.is_absolute():
-            p = (config_dir / p).resolve()
-        out["racine_destination"] = str(p)
+    # INBOX et racine destination : relatifs au config ou absolus/UNC.
+    # Un chemin absolu est gardé tel quel (str(Path) : pas de réduction lexicale des « .. »,
+    # qui changerait la cible si un composant est un lien symbolique).
+    for key in ("inbox", "racine_destination"):
+        val = out.get(key)
+        if val:
+            p = Path(val)
+            if not p.is_absolute():
+                p = (config_dir / p).resolve()
+            out[key] = str(p)
 
     # Dossiers A_CLASSER et FAILED (optionnels, relatifs à racine ou absolus)
+    racine = out.get("racine_destination")
     for key in ("dossier_a_classer", "dossier_failed"):
         val = out.get(key)
         if val:
             p = Path(val)
-            if not p.is_absolute() and out.get("racine_destination"):
-                p = Path(out["racine_destination"]) / p
+            if not p.is_absolute() and racine:
+                p = Path(racine) / p
             out[key] = str(p)
 
     return out
@@ -75,12 +99,12 @@ def get_racine_destination(config: dict[str, Any]) -> Path:
 
 def get_dossier_a_classer(config: dict[str, Any]) -> Path:
     """Retourne le dossier A_CLASSER (défaut: racine/A_CLASSER)."""
-    return Path(config.get("dossier_a_classer") or config["racine_destination"] + "/A_CLASSER")
+    return Path(config.get("dossier_a_classer") or os.path.join(config["racine_destination"], "A_CLASSER"))
 
 
 def get_dossier_failed(config: dict[str, Any]) -> Path:
     """Retourne le dossier FAILED (défaut: racine/FAILED)."""
-    return Path(config.get("dossier_failed") or config["racine_destination"] + "/FAILED")
+    return Path(config.get("dossier_failed") or os.path.join(config["racine_destination"], "FAILED"))
 
 
 def save_config(config: dict[str, Any], config_path: str | Path) -> None:
@@ -92,4 +116,4 @@ def save_config(config: dict[str, Any], config_path: str | Path) -> None:
     path = Path(config_path)
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(config, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        yaml.dump(config, f, **_DUMP_OPTIONS)
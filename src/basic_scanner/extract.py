@@ -27,6 +27,7 @@ MONTHS_FR = (
     "janvier", "février", "mars", "avril", "mai", "juin",
     "juillet", "août", "septembre", "octobre", "novembre", "décembre"
 )
+_MONTH_INDEX = {name: i for i, name in enumerate(MONTHS_FR, start=1)}
 DATE_FR_LONG = re.compile(
     r"\b(\d{1,2})\s+(" + "|".join(MONTHS_FR) + r")\s+(\d{4})\b",
     re.IGNORECASE
@@ -55,6 +56,15 @@ NUM_FACTURE_ALT = re.compile(
     re.IGNORECASE
 )
 
+# Fournisseur (best effort)
+_FOURN_AFTER_FACT = re.compile(
+    r"(?:facture|invoice)\s*(?:n°?)?\s*[^\n]*\n\s*([^\n]{3,80})",
+    re.IGNORECASE
+)
+_SIRET_RE = re.compile(r"SIRET\s*:?\s*[\d\s]{14,}", re.IGNORECASE)
+_ONLY_DIGITS = re.compile(r"^[\d\s\-]+$")
+_ONLY_NUMERIC = re.compile(r"^[\d\s\.,€]+$")
+
 # Mots-clés type document (ordre de test : avoir avant facture, puis devis, courrier, plan, impots)
 KEYWORDS_FACTURE = ("facture", "invoice", "rechnung")
 KEYWORDS_AVOIR = ("avoir", "credit note", "crédit", "remboursement", "refund")
@@ -64,6 +74,34 @@ KEYWORDS_PLAN = ("plan", "schéma", "schema", "drawing", "plan de", "plan d'")
 KEYWORDS_IMPOTS = ("impôts", "impots", "avis d'imposition", "avis d'impôt", "dgfip", "urssaf", "caf", "taxe", "fiscal", "revenus")
 
 
+def _build_type_keywords() -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """
+    Table (type, mots-clés) dans l'ordre de priorité, sans les mots-clés qui ne peuvent jamais décider :
+    un mot-clé contenant un mot-clé testé avant lui (ex. « plan de » après « plan ») n'est présent
+    que si ce dernier l'est aussi, et le type a alors déjà été retourné.
+    """
+    table = []
+    seen: list[str] = []
+    for type_doc, keywords in (
+        ("avoir", KEYWORDS_AVOIR),
+        ("facture_fournisseur", KEYWORDS_FACTURE),
+        ("devis", KEYWORDS_DEVIS),
+        ("courrier", KEYWORDS_COURRIER),
+        ("plan", KEYWORDS_PLAN),
+        ("impots", KEYWORDS_IMPOTS),
+    ):
+        kept = []
+        for k in keywords:
+            if not any(prev in k for prev in seen):
+                kept.append(k)
+            seen.append(k)
+        table.append((type_doc, tuple(kept)))
+    return tuple(table)
+
+
+_TYPE_KEYWORDS = _build_type_keywords()
+
+
 def _parse_fr_date(m: re.Match) -> Optional[date]:
     d, mth, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
     if y < 100:
@@ -86,23 +124,29 @@ def _parse_fr_long_date(m: re.Match) -> Optional[date]:
     day = int(m.group(1))
     month_name = m.group(2).lower()
     year = int(m.group(3))
+    month = _MONTH_INDEX.get(month_name)
+    if month is None:
+        return None
     try:
-        month = MONTHS_FR.index(month_name) + 1
         return date(year, month, day)
-    except (ValueError, IndexError):
+    except ValueError:
         return None
 
 
+_DATE_PARSERS = (
+    (DATE_ISO, _parse_iso_date),
+    (DATE_FR, _parse_fr_date),
+    (DATE_FR_LONG, _parse_fr_long_date),
+)
+
+
 def extract_date(texte: str) -> Optional[date]:
     """Extrait la première date plausible (facture) du texte."""
-    for pattern, parse in [
-        (DATE_ISO, _parse_iso_date),
-        (DATE_FR, _parse_fr_date),
-        (DATE_FR_LONG, _parse_fr_long_date),
-    ]:
+    for pattern, parse in _DATE_PARSERS:
         for m in pattern.finditer(texte):
             d = parse(m)
-            if d and (date(2000, 1, 1) <= d <= date(2030, 12, 31)):
+            # Plage 2000-01-01..2030-12-31 testée sur l'année : pas de date() construite par candidat
+            if d and 2000 <= d.year <= 2030:
                 return d
     return None
 
@@ -116,13 +160,15 @@ def extract_montant_ttc(texte: str) -> Optional[float]:
             return float(s)
         except ValueError:
             pass
-    for m in reversed(list(MONTANT_FALLBACK.finditer(texte))):
+    # Dernier montant convertible : un seul passage, sans matérialiser la liste des correspondances
+    last = None
+    for m in MONTANT_FALLBACK.finditer(texte):
         s = m.group(1).replace(" ", "").replace(",", ".")
         try:
-            return float(s)
+            last = float(s)
         except ValueError:
             continue
-    return None
+    return last
 
 
 def extract_numero_facture(texte: str) -> Optional[str]:
@@ -139,24 +185,10 @@ def extract_numero_facture(texte: str) -> Optional[str]:
 def extract_type_document(texte: str) -> str:
     """Détermine le type : facture_fournisseur, avoir, devis, courrier, plan, impots, inconnu."""
     lower = texte.lower()
-    for k in KEYWORDS_AVOIR:
-        if k in lower:
-            return "avoir"
-    for k in KEYWORDS_FACTURE:
-        if k in lower:
-            return "facture_fournisseur"
-    for k in KEYWORDS_DEVIS:
-        if k in lower:
-            return "devis"
-    for k in KEYWORDS_COURRIER:
-        if k in lower:
-            return "courrier"
-    for k in KEYWORDS_PLAN:
-        if k in lower:
-            return "plan"
-    for k in KEYWORDS_IMPOTS:
-        if k in lower:
-            return "impots"
+    for type_doc, keywords in _TYPE_KEYWORDS:
+        for k in keywords:
+            if k in lower:
+                return type_doc
     return "inconnu"
 
 
@@ -166,20 +198,16 @@ def extract_fournisseur_raw(texte: str) -> Optional[str]:
     Retourne le texte brut à faire matcher plus tard avec le dictionnaire.
     """
     # Ligne après "Facture" ou en-tête
-    m = re.search(
-        r"(?:facture|invoice)\s*(?:n°?)?\s*[^\n]*\n\s*([^\n]{3,80})",
-        texte,
-        re.IGNORECASE,
-    )
+    m = _FOURN_AFTER_FACT.search(texte)
     if m:
         line = m.group(1).strip()
         # Enlever numéros seuls
-        if re.match(r"^[\d\s\-]+$", line):
+        if _ONLY_DIGITS.match(line):
             return None
         return line[:80]
 
     # SIRET présent : on peut retourner une ligne contenant un nom
-    siret = re.search(r"SIRET\s*:?\s*[\d\s]{14,}", texte, re.IGNORECASE)
+    siret = _SIRET_RE.search(texte)
     if siret:
         start = max(0, siret.start() - 80)
         chunk = texte[start : siret.start()]
@@ -190,7 +218,7 @@ def extract_fournisseur_raw(texte: str) -> Optional[str]:
     # Première ligne non vide significative (souvent le fournisseur)
     for line in texte.splitlines():
         line = line.strip()
-        if 5 <= len(line) <= 80 and not re.match(r"^[\d\s\.,€]+$", line):
+        if 5 <= len(line) <= 80 and not _ONLY_NUMERIC.match(line):
             return line
     return None
 
@@ -43,7 +43,10 @@ def setup_logging(
             path = log_dir / path
         path = path.resolve()
         path.parent.mkdir(parents=True, exist_ok=True)
-        fh = logging.FileHandler(path, encoding="utf-8")
+        # delay=True : le fichier n'est ouvert qu'au premier enregistrement.
+        # Pas de tampon : le watcher est arrêté par terminate() depuis la GUI, sans vidage à la sortie,
+        # et les lignes « Déplacement … » servent de journal d'audit
+        fh = logging.FileHandler(path, encoding="utf-8", delay=True)
         fh.setLevel(level)
         fh.setFormatter(fmt)
         root.addHandler(fh)
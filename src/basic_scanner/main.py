@@ -1,7 +1,8 @@
 """
 CLI BASIC Scanner : run (surveillance) et test-file (traitement d'un fichier).
 """
-import fnmatch
+import os
+import queue
 import sys
 import threading
 import time
@@ -18,53 +19,75 @@ from basic_scanner.config import (
 )
 from basic_scanner.extract import extract_all
 from basic_scanner.logging_conf import get_logger, setup_logging
+from basic_scanner.models import RuntimeConfig
 from basic_scanner.mover import move_to_a_classer, move_to_destination, move_to_failed
-from basic_scanner.ocr import extract_text_from_pdf
+from basic_scanner.ocr import DEFAULT_OCR_DPI, DEFAULT_OCR_PSM, extract_text_from_pdf
 from basic_scanner.rules import (
     build_destination_filename,
     build_destination_path,
+    build_placeholders,
     get_filename_template_for_dest,
     get_rule_for_type,
 )
 from basic_scanner.suppliers import resolve_fournisseur
-from basic_scanner.watcher import run_watcher
+from basic_scanner.watcher import compile_exclude_patterns, matches_exclude, run_watcher
 
 logger = get_logger("main")
 
+# Traitement des PDF stables : file bornée + threads de traitement (config max_queue / worker_threads).
+# Peu de threads par défaut : l'OCR d'un document répartit déjà ses pages sur les cœurs.
+DEFAULT_MAX_QUEUE = 256
+DEFAULT_WORKER_THREADS = max(1, min(2, (os.cpu_count() or 1) // 2))
+
 # --- Pipeline de traitement ---
 
 
+def build_runtime_config(config: dict) -> RuntimeConfig:
+    """Extrait une fois de config les valeurs lues pour chaque PDF (chemins, mapping, OCR)."""
+    return RuntimeConfig(
+        config=config,
+        racine_destination=get_racine_destination(config),
+        dossier_a_classer=get_dossier_a_classer(config),
+        dossier_failed=get_dossier_failed(config),
+        mapping_fournisseurs=config.get("mapping_fournisseurs") or {},
+        modele_nom_fichier=config.get("modele_nom_fichier", ""),
+        ocr_lang=config.get("ocr_lang", "fra+eng"),
+        ocr_dpi=int(config.get("ocr_dpi") or DEFAULT_OCR_DPI),
+        ocr_psm=int(config.get("ocr_psm") or DEFAULT_OCR_PSM),
+    )
+
+
 def process_one_pdf(
     pdf_path: Path,
-    config: dict,
+    cfg: RuntimeConfig,
     dry_run: bool = False,
 ) -> Optional[dict]:
     """
     Traite un PDF : OCR, extraction, classification, déplacement.
     Retourne un dict avec le résultat (dest_path, extracted, error) ou None en cas d'échec.
     En cas d'exception non récupérable, déplace vers FAILED.
+    :param cfg: Configuration préparée par build_runtime_config (une fois par processus).
     """
-    inbox = get_inbox_path(config)
-    racine = get_racine_destination(config)
-    a_classer = get_dossier_a_classer(config)
-    failed = get_dossier_failed(config)
-    modele_chemin = config.get("modele_chemin", "Factures_fournisseurs/{fournisseur}/{YYYY}/{MM}")
-    mapping = config.get("mapping_fournisseurs") or {}
-    ocr_lang = config.get("ocr_lang", "fra+eng")
+    config = cfg.config
+    racine = cfg.racine_destination
+    a_classer = cfg.dossier_a_classer
+    failed = cfg.dossier_failed
 
     if not pdf_path.is_file():
         logger.error("Fichier introuvable: %s", pdf_path)
         return None
+    # Chemin affiché, calculé une fois et sans résolution des liens (resolve = stat par composant sur un NAS)
+    src_abs = os.path.abspath(pdf_path)
 
     try:
         # 1. Extraire le texte (OCR si nécessaire)
-        texte = extract_text_from_pdf(pdf_path, lang=ocr_lang)
+        texte = extract_text_from_pdf(pdf_path, lang=cfg.ocr_lang, dpi=cfg.ocr_dpi, psm=cfg.ocr_psm)
         if not texte or len(texte.strip()) < 10:
             logger.warning("Texte extrait vide ou très court pour %s", pdf_path.name)
 
         # 2. Extraction des métadonnées
         extracted = extract_all(texte)
-        resolve_fournisseur(extracted, mapping)
+        resolve_fournisseur(extracted, cfg.mapping_fournisseurs)
         extracted.confidence = compute_confidence(extracted)
         ensure_type_doc(extracted)
 
@@ -76,25 +99,27 @@ def process_one_pdf(
 
         if has_arborescence:
             modele_chemin_doc = rule[0]
-            modele_nom_doc = (rule[1] or config.get("modele_nom_fichier", "")).strip() or None
-            dest_dir = build_destination_path(racine, modele_chemin_doc, extracted, config)
+            modele_nom_doc = (rule[1] or cfg.modele_nom_fichier).strip() or None
+            # Placeholders calculés une fois pour le chemin et le nom
+            placeholders = build_placeholders(extracted, config)
+            dest_dir = build_destination_path(racine, modele_chemin_doc, extracted, config, placeholders)
             modele_nom_dest = modele_nom_doc or get_filename_template_for_dest(dest_dir, config)
-            dest_filename = build_destination_filename(modele_nom_dest, extracted, config)
+            dest_filename = build_destination_filename(modele_nom_dest, extracted, config, placeholders)
             result = move_to_destination(pdf_path, dest_dir, dest_filename, extracted, dry_run=dry_run)
             if not dry_run and result.moved:
-                print(f"[Déplacement] {pdf_path.resolve()} -> {result.dest_dir / result.dest_filename}", flush=True)
+                print(f"[Déplacement] {src_abs} -> {result.dest_dir / result.dest_filename}", flush=True)
         else:
             # Aucune arborescence pour ce document → dossier par défaut A_CLASSER
             result = move_to_a_classer(pdf_path, a_classer, extracted, dry_run=dry_run, write_metadata=True)
             if not dry_run and result.moved:
                 dest_full = result.dest_dir / result.dest_filename
-                print(f"[Déplacement] {pdf_path.resolve()} -> {dest_full.resolve()} (A_CLASSER)", flush=True)
+                print(f"[Déplacement] {src_abs} -> {os.path.abspath(dest_full)} (A_CLASSER)", flush=True)
 
         # Échec du déplacement (vers arborescence ou A_CLASSER) → FAILED
         if result.error and not dry_run:
             failed_path = move_to_failed(pdf_path, failed, result.error, dry_run=False)
             if failed_path:
-                print(f"[Déplacement FAILED] {pdf_path.resolve()} -> {failed_path.resolve()} (raison: {result.error})", flush=True)
+                print(f"[Déplacement FAILED] {src_abs} -> {os.path.abspath(failed_path)} (raison: {result.error})", flush=True)
             return {"error": result.error, "extracted": extracted.to_dict()}
 
         out = {
@@ -112,23 +137,48 @@ def process_one_pdf(
         if not dry_run:
             failed_path = move_to_failed(pdf_path, failed, str(e), dry_run=False)
             if failed_path:
-                print(f"[Déplacement FAILED] {pdf_path.resolve()} -> {failed_path.resolve()} (raison: {e})", flush=True)
+                print(f"[Déplacement FAILED] {src_abs} -> {os.path.abspath(failed_path)} (raison: {e})", flush=True)
         return {"error": str(e), "extracted": {}}
 
 
 def on_stable_file_factory(config: dict):
-    """Fabrique le callback appelé quand un fichier est stable dans l'INBOX."""
-    def on_stable_file(path: Path) -> None:
-        process_one_pdf(path, config, dry_run=False)
-    return on_stable_file
+    """
+    Fabrique le callback appelé quand un fichier est stable dans l'INBOX.
+    Le callback ne traite pas le fichier : il le met dans une file bornée (max_queue), vidée par
+    worker_threads threads ; file pleine = le callback attend (pas de fichier perdu ni de thread en plus).
+    Un fichier déjà en file ou en cours de traitement n'est pas ajouté une seconde fois
+    (surveillance et scan des fichiers existants peuvent signaler le même PDF).
+    """
+    cfg = build_runtime_config(config)
+    pending: queue.Queue[Path] = queue.Queue(maxsize=int(config.get("max_queue") or DEFAULT_MAX_QUEUE))
+    # Clé normalisée (casse Windows) : la surveillance et le scan de démarrage passent des chemins résolus,
+    # écrits éventuellement avec une casse différente
+    in_flight: set[str] = set()
+    lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            path = pending.get()
+            try:
+                process_one_pdf(path, cfg, dry_run=False)
+            except Exception as e:
+                logger.exception("Erreur traitement %s: %s", path, e)
+            finally:
+                with lock:
+                    in_flight.discard(os.path.normcase(path))
 
+    for i in range(int(config.get("worker_threads") or DEFAULT_WORKER_THREADS)):
+        threading.Thread(target=worker, name=f"basic_scanner-worker-{i + 1}", daemon=True).start()
+
+    def on_stable_file(path: Path) -> None:
+        key = os.path.normcase(path)
+        with lock:
+            if key in in_flight:
+                return
+            in_flight.add(key)
+        pending.put(path)
 
-def _should_exclude(path: Path, exclude_patterns: list[str]) -> bool:
-    """True si le fichier doit être exclu (tmp, ~, .part, etc.)."""
-    for pattern in exclude_patterns:
-        if fnmatch.fnmatch(path.name, pattern):
-            return True
-    return False
+    return on_stable_file
 
 
 def _scan_existing_pdfs(
@@ -142,12 +192,21 @@ def _scan_existing_pdfs(
     Ainsi les fichiers déposés avant le lancement de la surveillance sont aussi triés.
     """
     time.sleep(stability_seconds)
-    if not inbox.is_dir():
+    # os.scandir : le type vient de l'entrée de répertoire (pas de stat par fichier) ;
+    # liste figée avant traitement, puisque chaque callback retire son fichier de l'INBOX
+    try:
+        with os.scandir(inbox) as it:
+            # Résolus comme ceux de la surveillance (watcher) : même clé anti-doublon dans on_stable_file
+            pdfs = [
+                Path(entry.path).resolve()
+                for entry in it
+                if entry.name.lower().endswith(".pdf") and entry.is_file()
+            ]
+    except OSError:  # INBOX absente ou inaccessible
         return
-    for path in inbox.iterdir():
-        if not path.is_file() or path.suffix.lower() != ".pdf":
-            continue
-        if _should_exclude(path, exclude_patterns):
+    exclude = compile_exclude_patterns(exclude_patterns)
+    for path in pdfs:
+        if matches_exclude(path.name, exclude):
             continue
         try:
             logger.info("Traitement fichier existant au démarrage: %s", path.name)
@@ -210,7 +269,7 @@ def cmd_test_file(
     if not path.is_file():
         print(f"Fichier introuvable: {path}", file=sys.stderr)
         sys.exit(1)
-    result = process_one_pdf(path, config, dry_run=dry_run)
+    result = process_one_pdf(path, build_runtime_config(config), dry_run=dry_run)
     if result is None:
         sys.exit(2)
     import json
@@ -19,6 +19,8 @@ class ExtractedData:
     fournisseur_raw: Optional[str] = None  # texte brut trouvé avant matching
     texte_complet: str = ""
     confidence: float = 0.0  # 0..1
+    # Libellé court du type (FACT, AVR…) posé par classify.ensure_type_doc ; None tant qu'il n'est pas calculé
+    _type_doc_slug: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict:
         """Sérialisation pour JSON (dates en ISO)."""
@@ -57,3 +59,18 @@ class WatcherConfig:
     stability_check_interval: float = 1.0
     min_file_size: int = 0
     exclude_patterns: list[str] = field(default_factory=lambda: ["*.tmp", "~*", "*.part"])
+
+
+@dataclass(frozen=True, slots=True)
+class RuntimeConfig:
+    """Valeurs de configuration utilisées pour chaque PDF, calculées une fois au démarrage."""
+
+    config: dict  # configuration complète (règles, formats par dossier, clés personnalisées)
+    racine_destination: Path
+    dossier_a_classer: Path
+    dossier_failed: Path
+    mapping_fournisseurs: dict
+    modele_nom_fichier: str
+    ocr_lang: str
+    ocr_dpi: int
+    ocr_psm: int
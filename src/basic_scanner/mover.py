@@ -2,7 +2,9 @@
 Déplacement / renommage des fichiers avec gestion des collisions.
 Ne jamais supprimer : en cas d'erreur → FAILED.
 """
+import errno
 import json
+import os
 import shutil
 from pathlib import Path
 from typing import Optional
@@ -10,9 +12,22 @@ from typing import Optional
 from basic_scanner.logging_conf import get_logger
 from basic_scanner.models import ExtractedData, ProcessingResult
 
+# Sérialisation JSON en C (orjson) si installé, sinon module json standard
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = get_logger("mover")
 
 
+def _metadata_bytes(extracted: ExtractedData) -> bytes:
+    """Métadonnées extraites en JSON UTF-8 indenté (fichier lu par l'utilisateur qui classe à la main)."""
+    if orjson is not None:
+        return orjson.dumps(extracted.to_dict(), option=orjson.OPT_INDENT_2)
+    return json.dumps(extracted.to_dict(), ensure_ascii=False, indent=2).encode("utf-8")
+
+
 def _ensure_dir(path: Path) -> None:
     """Crée le répertoire (et parents) si nécessaire. Supporte UNC."""
     try:
@@ -22,19 +37,67 @@ def _ensure_dir(path: Path) -> None:
         raise
 
 
-def _unique_path(dest_dir: Path, base_name: str) -> Path:
-    """Retourne un chemin unique : si le fichier existe, ajoute un suffixe _1, _2, ..."""
+def _move_file(source_path: Path, final_path: Path) -> None:
+    """
+    Déplace source_path vers final_path sans jamais remplacer un fichier existant :
+    FileExistsError si final_path existe déjà (nom pris entre-temps par un autre worker, cf. _move_to_unique).
+    Windows : os.rename, qui refuse une destination existante. Ailleurs os.rename remplacerait la cible :
+    lien physique (os.link, échoue si la cible existe) puis suppression de la source.
+    Autre volume (NAS, autre disque) ou liens non supportés : nom réservé par création exclusive (O_EXCL),
+    puis copie (shutil.copyfile copie dans le noyau, sendfile / copy_file_range, quand c'est possible)
+    et suppression de la source. En cas d'échec de la copie, la copie partielle est supprimée
+    et la source reste intacte.
+    """
+    if os.name == "nt":
+        try:
+            os.rename(source_path, final_path)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    else:
+        try:
+            os.link(source_path, final_path)
+        except FileExistsError:
+            raise
+        except OSError:
+            pass  # autre volume (EXDEV) ou système de fichiers sans liens physiques : copie
+        else:
+            try:
+                os.unlink(source_path)
+            except BaseException:
+                os.unlink(final_path)
+                raise
+            return
+    fd = os.open(final_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+    os.close(fd)
+    try:
+        shutil.copyfile(source_path, final_path)
+        shutil.copystat(source_path, final_path)
+    except BaseException:
+        final_path.unlink(missing_ok=True)
+        raise
+    os.unlink(source_path)
+
+
+def _move_to_unique(source_path: Path, dest_dir: Path, base_name: str) -> Path:
+    """
+    Déplace source_path dans dest_dir sous base_name, ou avec un suffixe _1, _2, ... si le nom est pris.
+    Réservation et déplacement ne font qu'une opération (_move_file ne remplace jamais) : deux workers
+    qui visent le même nom ne peuvent pas s'écraser. Retourne le chemin final.
+    """
     dest = dest_dir / base_name
-    if not dest.exists():
-        return dest
     stem = dest.stem
     suffix = dest.suffix
-    i = 1
+    candidate = dest
+    i = 0
     while True:
-        candidate = dest_dir / f"{stem}_{i}{suffix}"
-        if not candidate.exists():
+        try:
+            _move_file(source_path, candidate)
             return candidate
-        i += 1
+        except FileExistsError:
+            i += 1
+            candidate = dest_dir / f"{stem}_{i}{suffix}"
 
 
 def move_to_destination(
@@ -65,12 +128,11 @@ def move_to_destination(
 
     try:
         _ensure_dir(dest_dir)
-        final_path = _unique_path(dest_dir, dest_filename)
-        shutil.move(str(source_path), str(final_path))
+        final_path = _move_to_unique(source_path, dest_dir, dest_filename)
         result.dest_filename = final_path.name
         result.moved = True
-        final_path_resolved = final_path.resolve()
-        logger.info("Déplacement: %s -> %s", source_path.resolve(), final_path_resolved)
+        # abspath : chemins absolus pour le journal sans stat/readlink par composant (resolve), coûteux sur un NAS
+        logger.info("Déplacement: %s -> %s", os.path.abspath(source_path), os.path.abspath(final_path))
         return result
     except Exception as e:
         result.error = str(e)
@@ -113,17 +175,15 @@ def move_to_a_classer(
 
     try:
         _ensure_dir(dossier_a_classer)
-        final_path = _unique_path(dossier_a_classer, dest_filename)
-        shutil.move(str(source_path), str(final_path))
+        final_path = _move_to_unique(source_path, dossier_a_classer, dest_filename)
         result.dest_filename = final_path.name
         result.moved = True
 
         if write_metadata:
             meta_path = final_path.with_suffix(final_path.suffix + ".json")
-            with open(meta_path, "w", encoding="utf-8") as f:
-                json.dump(extracted.to_dict(), f, ensure_ascii=False, indent=2)
-        final_path_resolved = final_path.resolve()
-        logger.info("Déplacement (A_CLASSER): %s -> %s", source_path.resolve(), final_path_resolved)
+            # Sérialisé d'un bloc puis écrit en une fois (json.dump écrit par petits morceaux)
+            meta_path.write_bytes(_metadata_bytes(extracted))
+        logger.info("Déplacement (A_CLASSER): %s -> %s", os.path.abspath(source_path), os.path.abspath(final_path))
         return result
     except Exception as e:
         result.error = str(e)
@@ -151,10 +211,11 @@ def move_to_failed(
     try:
         _ensure_dir(dossier_failed)
         base = source_path.stem + "_FAILED" + source_path.suffix
-        final_path = _unique_path(dossier_failed, base)
-        shutil.move(str(source_path), str(final_path))
-        final_path_resolved = final_path.resolve()
-        logger.error("Déplacement (FAILED): %s -> %s (raison: %s)", source_path.resolve(), final_path_resolved, error_message)
+        final_path = _move_to_unique(source_path, dossier_failed, base)
+        logger.error(
+            "Déplacement (FAILED): %s -> %s (raison: %s)",
+            os.path.abspath(source_path), os.path.abspath(final_path), error_message,
+        )
         return final_path
     except Exception as e:
         logger.exception("Impossible de déplacer vers FAILED: %s", source_path)
@@ -4,6 +4,12 @@ OCR local pour PDF scannés (contenant des images).
 - Les PDF issus d'un scan n'ont en général pas de couche texte : on déclenche l'OCR
   dès que peu de texte est extrait, puis fallback sur reconnaissance directe des images.
 """
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import Optional
 
@@ -14,8 +20,18 @@ logger = get_logger("ocr")
 # Seuil en caractères : en dessous, on considère que le PDF est image-only (scan) et on lance l'OCR
 MIN_TEXT_LENGTH_FOR_OCR = 30
 
+# Fallback OCR (rendu des pages) : résolution et mode de segmentation Tesseract (config ocr_dpi / ocr_psm).
+# Coût Tesseract ∝ nombre de pixels ; PSM 6 (un bloc de texte uniforme) évite l'analyse de mise en page
+# et l'OSD du mode 3 par défaut, suffisant pour des factures en une colonne.
+DEFAULT_OCR_DPI = 120
+DEFAULT_OCR_PSM = 6
+
 _OCRMYPDF_AVAILABLE: Optional[bool] = None
 _PYTESSERACT_AVAILABLE: Optional[bool] = None
+_TESSEROCR_AVAILABLE: Optional[bool] = None
+
+# API Tesseract en mémoire (tesserocr), une par thread et par langue : modèles chargés une seule fois
+_tess_local = threading.local()
 
 
 def _check_ocrmypdf() -> bool:
@@ -42,84 +58,211 @@ def _check_pytesseract() -> bool:
     return _PYTESSERACT_AVAILABLE
 
 
-def _extract_text_from_pdf_images(pdf_path: Path, lang: str = "fra+eng") -> str:
+def _check_tesserocr() -> bool:
+    global _TESSEROCR_AVAILABLE
+    if _TESSEROCR_AVAILABLE is not None:
+        return _TESSEROCR_AVAILABLE
+    try:
+        import tesserocr  # noqa: F401
+        _TESSEROCR_AVAILABLE = True
+    except ImportError:
+        _TESSEROCR_AVAILABLE = False
+    return _TESSEROCR_AVAILABLE
+
+
+def _get_tess_api(lang: str, psm: int):
     """
-    Fallback OCR : rend chaque page du PDF en image puis reconnaît le texte avec Tesseract (pytesseract).
-    Utilisé quand ocrmypdf n'est pas disponible ou a échoué.
-    Les PDF scannés contiennent des images ; cette méthode lit le texte dans ces images.
+    Retourne l'API tesserocr de ce thread pour (lang, psm), créée au premier appel puis réutilisée
+    (pas de processus tesseract ni de rechargement des modèles à chaque page).
     """
-    if not _check_pytesseract():
-        logger.warning("pytesseract non disponible; impossible d'extraire le texte des images.")
+    apis = getattr(_tess_local, "apis", None)
+    if apis is None:
+        apis = _tess_local.apis = {}
+    api = apis.get((lang, psm))
+    if api is None:
+        import tesserocr
+
+        api = apis[(lang, psm)] = tesserocr.PyTessBaseAPI(lang=lang, psm=psm, oem=tesserocr.OEM.LSTM_ONLY)
+    return api
+
+
+def _init_ocr_worker() -> None:
+    """Initialisation d'un processus du pool OCR : Tesseract mono-thread (son OpenMP passe mal à l'échelle)."""
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+
+def _ocr_page(page, page_number: int, lang: str, dpi: int, psm: int) -> str:
+    """Rend une page (fitz.Page) en image puis la reconnaît avec Tesseract."""
+    import fitz  # PyMuPDF
+
+    # Rendre la page en image (niveaux de gris : Tesseract binarise de toute façon, 3× moins d'octets que RGB)
+    pix = page.get_pixmap(alpha=False, dpi=dpi, colorspace=fitz.csGRAY)
+    if pix.width == 0 or pix.height == 0:
+        return ""
+    try:
+        # Tesseract accepte plusieurs langues avec + (ex: fra+eng)
+        if _check_tesserocr():
+            # Pixels bruts du pixmap passés tels quels : pas d'image PIL intermédiaire
+            api = _get_tess_api(lang, psm)
+            api.SetImageBytes(pix.samples, pix.width, pix.height, pix.n, pix.stride)
+            page_text = api.GetUTF8Text()
+        else:
+            import pytesseract
+            from PIL import Image
+
+            img = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            page_text = pytesseract.image_to_string(img, lang=lang, config=f"--psm {psm} --oem 1")
+    except Exception as e:
+        logger.debug("OCR page %s: %s", page_number, e)
         return ""
+    return page_text.strip() if page_text else ""
+
 
+def _ocr_pages(pdf_path: str, page_indices: list[int], lang: str, dpi: int, psm: int) -> list[str]:
+    """
+    OCR d'un lot de pages dans un processus du pool. Fonction de module (picklable) : le processus
+    ouvre le PDF une fois pour son lot et le referme aussitôt (pas de fichier verrouillé entre deux PDF).
+    """
     import fitz  # PyMuPDF
 
-    doc = fitz.open(str(pdf_path))
-    text_parts = []
+    doc = fitz.open(pdf_path)
     try:
-        for i, page in enumerate(doc):
-            # Rendre la page en image (matrice de pixels) pour Tesseract
-            pix = page.get_pixmap(alpha=False, dpi=150)
-            if pix.width == 0 or pix.height == 0:
-                continue
-            try:
-                from PIL import Image
-                img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
-            except ImportError:
-                logger.warning("PIL/Pillow non disponible pour le fallback OCR.")
-                break
-            try:
-                import pytesseract
-                # Tesseract accepte plusieurs langues avec + (ex: fra+eng)
-                page_text = pytesseract.image_to_string(img, lang=lang)
-                if page_text and page_text.strip():
-                    text_parts.append(page_text.strip())
-            except Exception as e:
-                logger.debug("OCR page %s: %s", i + 1, e)
+        return [_ocr_page(doc[i], i + 1, lang, dpi, psm) for i in page_indices]
     finally:
         doc.close()
 
-    result = "\n".join(text_parts).strip()
+
+# Pool de processus OCR partagé par tous les PDF du processus (créé au premier besoin) : chaque processus
+# garde son API Tesseract chargée (tesserocr) d'un document à l'autre au lieu de recharger les modèles
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # spawn partout : un fork depuis le watcher (threads watchdog, stabilité, workers) n'est pas sûr
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+            )
+            atexit.register(_ocr_pool.shutdown, cancel_futures=True)
+        return _ocr_pool
+
+
+def _discard_ocr_pool(pool: ProcessPoolExecutor) -> None:
+    """Abandonne un pool en échec (processus mort…) : le prochain PDF en recrée un."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_text_from_pdf_images(
+    doc, pdf_path: Path, lang: str = "fra+eng", dpi: int = DEFAULT_OCR_DPI, psm: int = DEFAULT_OCR_PSM
+) -> str:
+    """
+    Fallback OCR : rend chaque page du PDF en image puis reconnaît le texte avec Tesseract
+    (tesserocr en mémoire si installé, sinon pytesseract).
+    Utilisé quand ocrmypdf n'est pas disponible ou a échoué.
+    Les PDF scannés contiennent des images ; cette méthode lit le texte dans ces images.
+    Les pages sont réparties sur le pool de processus partagé (un lot par cœur), résultats remis dans l'ordre.
+    :param doc: Document fitz déjà ouvert sur pdf_path (pages traitées dans ce processus).
+    """
+    if not _check_tesserocr():
+        if not _check_pytesseract():
+            logger.warning("tesserocr / pytesseract non disponibles; impossible d'extraire le texte des images.")
+            return ""
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            logger.warning("PIL/Pillow non disponible pour le fallback OCR.")
+            return ""
+
+    page_count = doc.page_count
+    workers = min(os.cpu_count() or 1, page_count)
+    pages = None
+    if workers > 1:
+        # Un lot de pages par processus (pages i, i+workers, …) : un seul fitz.open par processus et par PDF
+        batches = [list(range(start, page_count, workers)) for start in range(workers)]
+        pool = _get_ocr_pool()
+        try:
+            results = list(pool.map(
+                _ocr_pages, repeat(str(pdf_path)), batches, repeat(lang), repeat(dpi), repeat(psm)
+            ))
+            pages = [""] * page_count
+            for batch, texts in zip(batches, results):
+                for i, text in zip(batch, texts):
+                    pages[i] = text
+        except Exception as e:
+            logger.warning("OCR parallèle indisponible (%s) : pages traitées une à une.", e)
+            _discard_ocr_pool(pool)
+    if pages is None:
+        # Une seule page (ou un seul cœur) : lancer un processus coûterait plus qu'il ne rapporte
+        pages = [_ocr_page(page, i + 1, lang, dpi, psm) for i, page in enumerate(doc)]
+
+    result = "\n".join(p for p in pages if p).strip()
     if result:
         logger.info("OCR fallback (images des pages) : %s caractères extraits pour %s", len(result), pdf_path.name)
     return result
 
 
-def ensure_pdf_has_text(pdf_path: Path, lang: str = "fra+eng") -> Path:
+# ocrmypdf.ocr() n'est pas prévu pour plusieurs appels simultanés dans un même processus
+# (workers de main.on_stable_file_factory) : un seul à la fois, les autres étapes restent parallèles
+_ocrmypdf_lock = threading.Lock()
+
+
+def ensure_pdf_has_text(pdf_path: Path, lang: str = "fra+eng") -> tuple[Path, Optional[str]]:
     """
     S'assure que le PDF contient une couche texte (OCR si nécessaire).
     Modifie le fichier sur place ou crée une copie temporaire selon ocrmypdf.
     :param pdf_path: Chemin du PDF.
     :param lang: Langues Tesseract (ex: fra+eng).
-    :return: Chemin du PDF avec texte (même fichier si déjà du texte, sinon OCRisé).
+    :return: (chemin du PDF avec texte, texte reconnu par l'OCR ou None si l'OCR n'a pas tourné).
     """
     if not _check_ocrmypdf():
         logger.warning("ocrmypdf non disponible; extraction texte sans OCR (peut être vide).")
-        return pdf_path
+        return pdf_path, None
 
+    output = pdf_path.parent / (pdf_path.stem + "_ocr.pdf")
+    sidecar = output.with_suffix(".txt")
     try:
         import ocrmypdf
         # ocrmypdf peut modifier in-place ou nécessiter output différent
-        # On utilise un fichier temporaire puis replace pour éviter lock
-        output = pdf_path.parent / (pdf_path.stem + "_ocr.pdf")
-        ocrmypdf.ocr(str(pdf_path), str(output), language=lang, skip_text=True)
+        # On utilise un fichier temporaire puis replace pour éviter lock.
+        # sidecar : ocrmypdf écrit aussi le texte reconnu, ce qui évite de relire le PDF produit
+        with _ocrmypdf_lock:
+            ocrmypdf.ocr(str(pdf_path), str(output), language=lang, skip_text=True, sidecar=str(sidecar))
         # Remplacer l'original par la version OCR pour la suite
         output.replace(pdf_path)
         logger.info("OCR appliqué: %s", pdf_path.name)
-        return pdf_path
+        try:
+            # Pages séparées par un saut de page (\f) dans le sidecar
+            return pdf_path, sidecar.read_text(encoding="utf-8").replace("\f", "\n").strip()
+        except OSError:
+            return pdf_path, None
     except Exception as e:
         logger.error("Échec OCR %s: %s", pdf_path, e)
         # On continue avec le PDF tel quel (extraction peut être vide)
-        return pdf_path
+        return pdf_path, None
+    finally:
+        sidecar.unlink(missing_ok=True)
 
 
-def extract_text_from_pdf(pdf_path: Path, lang: str = "fra+eng") -> str:
+def extract_text_from_pdf(
+    pdf_path: Path, lang: str = "fra+eng", dpi: int = DEFAULT_OCR_DPI, psm: int = DEFAULT_OCR_PSM
+) -> str:
     """
     Extrait tout le texte du PDF. Pour les PDF scannés (images sans couche texte),
     déclenche l'OCR : d'abord ocrmypdf (ajout d'une couche texte), puis en fallback
     lecture directe des images de chaque page avec Tesseract (pytesseract).
     :param pdf_path: Chemin du PDF.
     :param lang: Langues Tesseract (ex: fra+eng).
+    :param dpi: Résolution de rendu des pages pour le fallback Tesseract.
+    :param psm: Mode de segmentation Tesseract (--psm) pour le fallback.
     :return: Texte complet (concaténation des pages).
     """
     import fitz  # PyMuPDF
@@ -128,31 +271,59 @@ def extract_text_from_pdf(pdf_path: Path, lang: str = "fra+eng") -> str:
     if not path.is_file():
         return ""
 
-    # 1) Extraire le texte de la couche PDF (vide pour un scan pur)
+    # 1) Extraire le texte de la couche PDF (vide pour un scan pur).
+    # Le document reste ouvert pour le fallback images : rouvert seulement si ocrmypdf a réécrit le fichier.
     doc = fitz.open(str(path))
-    text_parts = []
     try:
+        text_parts = []
+        has_scanned_page = False
         for page in doc:
-            text_parts.append(page.get_text())
+            page_text = page.get_text()
+            text_parts.append(page_text)
+            # Page avec (presque) pas de texte mais au moins une image : page scannée, à OCRiser.
+            # Seuil et non texte vide : un scan porte souvent une petite couche texte (tampon, n° de page)
+            if (
+                not has_scanned_page
+                and len(page_text.strip()) < MIN_TEXT_LENGTH_FOR_OCR
+                and page.get_images()
+            ):
+                has_scanned_page = True
         full_text = "\n".join(text_parts).strip()
-    finally:
-        doc.close()
 
-    # 2) PDF scanné = peu ou pas de texte → reconnaissance du texte dans les images
-    if len(full_text) < MIN_TEXT_LENGTH_FOR_OCR:
-        # 2a) ocrmypdf : ajoute une couche texte au PDF puis on ré-extraît
-        ensure_pdf_has_text(path, lang=lang)
-        doc = fitz.open(str(path))
-        try:
-            text_parts = [page.get_text() for page in doc]
-            full_text = "\n".join(text_parts).strip()
-        finally:
+        if len(full_text) >= MIN_TEXT_LENGTH_FOR_OCR:
+            return full_text
+        if not has_scanned_page:
+            # Peu de texte mais aucune image à lire (pages blanches, dessin vectoriel) : l'OCR ne trouverait rien
+            # et ocrmypdf réécrirait le fichier pour rien
+            logger.debug("Aucune page scannée dans %s : OCR ignoré.", path.name)
+            return full_text
+
+        # 2) PDF scanné = peu ou pas de texte → reconnaissance du texte dans les images
+        if _check_ocrmypdf():
+            # 2a) ocrmypdf : ajoute une couche texte au PDF et retourne le texte reconnu (sidecar).
+            # Le fichier va être remplacé : on le ferme d'abord (verrou sous Windows).
             doc.close()
+            doc = None
+            _, ocr_text = ensure_pdf_has_text(path, lang=lang)
+            # Si la couche d'origine était vide, aucune page n'a été sautée (skip_text) : le sidecar contient
+            # tout le texte et le PDF n'est pas relu ; sinon on ré-extrait la couche complétée.
+            if ocr_text is not None and not full_text:
+                full_text = ocr_text
+            else:
+                doc = fitz.open(str(path))
+                full_text = "\n".join(page.get_text() for page in doc).strip()
+        else:
+            logger.warning("ocrmypdf non disponible; extraction texte sans OCR (peut être vide).")
 
         # 2b) Si toujours insuffisant (ocrmypdf indisponible ou échec), fallback : lire les images des pages
         if len(full_text) < MIN_TEXT_LENGTH_FOR_OCR:
-            fallback_text = _extract_text_from_pdf_images(path, lang=lang)
+            if doc is None:
+                doc = fitz.open(str(path))
+            fallback_text = _extract_text_from_pdf_images(doc, path, lang=lang, dpi=dpi, psm=psm)
             if len(fallback_text) > len(full_text):
                 full_text = fallback_text
+    finally:
+        if doc is not None:
+            doc.close()
 
     return full_text
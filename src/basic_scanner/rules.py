@@ -2,6 +2,7 @@
 Règles de classement : format chemin/nom, slugify.
 Support des placeholders : fournisseur, YYYY, MM, DD, numero, montant, type_doc.
 """
+import functools
 import re
 import unicodedata
 from pathlib import Path
@@ -11,6 +12,23 @@ from basic_scanner.classify import get_type_doc_slug
 from basic_scanner.models import ExtractedData
 
 
+_RE_NONALNUM = re.compile(r"[^\w\s\-]")
+_RE_SEP = re.compile(r"[-\s]+")
+# Pas d'accolade dans le nom : une « { » isolée du texte n'avale pas le placeholder qui la suit
+_RE_PLACEHOLDER = re.compile(r"\{([^}{]+)\}")
+# Accolades restantes après remplacement ({{cle}}, valeur contenant {…}) : supprimées
+_RE_LEFTOVER = re.compile(r"\{[^}]+\}")
+
+# Table de suppression des diacritiques (catégorie Mn) des blocs « combining diacritical marks » :
+# str.translate fait en C la boucle par caractère
+_STRIP_ACCENTS = {
+    cp: None
+    for start, end in ((0x0300, 0x0370), (0x1AB0, 0x1B00), (0x1DC0, 0x1E00), (0x20D0, 0x2100), (0xFE20, 0xFE30))
+    for cp in range(start, end)
+    if unicodedata.category(chr(cp)) == "Mn"
+}
+
+
 def slugify(value: str, max_length: int = 80) -> str:
     """
     Nettoie une chaîne pour usage dans noms de dossiers/fichiers :
@@ -18,12 +36,11 @@ def slugify(value: str, max_length: int = 80) -> str:
     """
     if not value:
         return ""
-    # Normalisation NFD et suppression des accents
-    nfd = unicodedata.normalize("NFD", value)
-    ascii_str = "".join(c for c in nfd if unicodedata.category(c) != "Mn")
+    # Normalisation NFD et suppression des accents (inutile pour une chaîne déjà ASCII)
+    ascii_str = value if value.isascii() else unicodedata.normalize("NFD", value).translate(_STRIP_ACCENTS)
     # Garder alphanum, espaces, tirets, underscores
-    ascii_str = re.sub(r"[^\w\s\-]", " ", ascii_str)
-    ascii_str = re.sub(r"[-\s]+", "_", ascii_str).strip("_")
+    ascii_str = _RE_NONALNUM.sub(" ", ascii_str)
+    ascii_str = _RE_SEP.sub("_", ascii_str).strip("_")
     return ascii_str[:max_length] if max_length else ascii_str
 
 
@@ -33,22 +50,26 @@ def _format_montant(montant: float | None) -> str:
     return f"{montant:.2f}".replace(".", ",").replace(",", "_")  # éviter . dans nom fichier
 
 
+_IMPOTS_SLUG = slugify("impots", 60)
+
+
 def build_placeholders(extracted: ExtractedData, config: dict | None = None) -> dict[str, Any]:
     """
     Construit le dictionnaire des placeholders pour chemin et nom fichier.
     Les clés personnalisées (config['cles_personnalisees']) sont fusionnées après les clés intégrées.
     """
     d = extracted.date_doc
-    yyyy = d.strftime("%Y") if d else "0000"
-    mm = d.strftime("%m") if d else "00"
-    dd = d.strftime("%d") if d else "00"
+    if d:
+        yyyy, mm, dd = f"{d.year:04d}", f"{d.month:02d}", f"{d.day:02d}"
+    else:
+        yyyy, mm, dd = "0000", "00", "00"
     fournisseur = (extracted.fournisseur or "Inconnu").strip()
     fournisseur_slug = slugify(fournisseur, 60)
     numero = (extracted.numero_facture or "N").strip()
     numero_slug = slugify(numero, 40)
     montant_str = _format_montant(extracted.montant_ttc)
     type_doc = get_type_doc_slug(extracted)
-    impots_slug = fournisseur_slug if type_doc == "IMPOTS" else slugify("impots", 60)
+    impots_slug = fournisseur_slug if type_doc == "IMPOTS" else _IMPOTS_SLUG
     client_slug = fournisseur_slug
 
     out = {
@@ -78,13 +99,27 @@ def build_placeholders(extracted: ExtractedData, config: dict | None = None) ->
     return out
 
 
+@functools.lru_cache(maxsize=128)
+def _compile_template(template: str) -> tuple[tuple[tuple[str, str], ...], str]:
+    """
+    Découpe template une fois pour toutes : ((texte littéral, clé du placeholder qui suit), ...), texte final.
+    Les modèles sont peu nombreux et réutilisés pour chaque document.
+    """
+    parts = []
+    pos = 0
+    for m in _RE_PLACEHOLDER.finditer(template):
+        parts.append((template[pos : m.start()], m.group(1)))
+        pos = m.end()
+    return tuple(parts), template[pos:]
+
+
 def apply_template(template: str, placeholders: dict[str, Any]) -> str:
-    """Remplace {key} par la valeur dans template."""
-    result = template
-    for key, value in placeholders.items():
-        result = result.replace("{" + key + "}", str(value))
-    # Nettoyer les placeholders non remplacés (optionnel)
-    result = re.sub(r"\{[^}]+\}", "", result)
+    """Remplace {key} par la valeur dans template (placeholders inconnus supprimés)."""
+    parts, tail = _compile_template(template)
+    # Un seul passage : seules les clés présentes dans le modèle sont consultées
+    result = "".join([literal + str(placeholders.get(key, "")) for literal, key in parts]) + tail
+    if "{" in result:
+        result = _RE_LEFTOVER.sub("", result)
     return result.strip("/").strip("\\").strip()
 
 
@@ -93,13 +128,16 @@ def build_destination_path(
     modele_chemin: str,
     extracted: ExtractedData,
     config: dict | None = None,
+    placeholders: dict[str, Any] | None = None,
 ) -> Path:
     """
     Construit le chemin de destination (dossier) à partir du modèle et des données extraites.
     Supporte chemins UNC (\\\\NAS\\...).
+    placeholders : résultat de build_placeholders déjà calculé pour ce document (sinon construit ici).
     """
     root = Path(racine_destination)
-    placeholders = build_placeholders(extracted, config)
+    if placeholders is None:
+        placeholders = build_placeholders(extracted, config)
     path_part = apply_template(modele_chemin, placeholders)
     # Éviter double backslash sur Windows sauf UNC
     parts = [p for p in path_part.replace("\\", "/").split("/") if p]
@@ -107,10 +145,14 @@ def build_destination_path(
 
 
 def build_destination_filename(
-    modele_nom_fichier: str, extracted: ExtractedData, config: dict | None = None
+    modele_nom_fichier: str,
+    extracted: ExtractedData,
+    config: dict | None = None,
+    placeholders: dict[str, Any] | None = None,
 ) -> str:
-    """Construit le nom de fichier de destination."""
-    placeholders = build_placeholders(extracted, config)
+    """Construit le nom de fichier de destination (placeholders : comme build_destination_path)."""
+    if placeholders is None:
+        placeholders = build_placeholders(extracted, config)
     name = apply_template(modele_nom_fichier, placeholders)
     if not name.lower().endswith(".pdf"):
         name += ".pdf"
@@ -126,17 +168,29 @@ def get_rule_for_type(type_document: str, config: dict) -> tuple[str, str] | Non
     regles = config.get("regles_classement") or []
     if not regles:
         return None
-    # Chercher une règle dont le type correspond
-    for r in regles:
-        t = (r.get("type") or "").strip().lower()
-        if t == type_document.lower():
-            return (r.get("modele_chemin") or ""), (r.get("modele_nom_fichier") or "")
-    # Règle "défaut"
-    for r in regles:
-        t = (r.get("type") or "").strip().lower()
-        if t == "défaut" or t == "defaut" or t == "default":
-            return (r.get("modele_chemin") or ""), (r.get("modele_nom_fichier") or "")
-    return None
+    index = _rules_index(tuple((r.get("type"), r.get("modele_chemin"), r.get("modele_nom_fichier")) for r in regles))
+    # Règle dont le type correspond, sinon règle "défaut"
+    return index.get(type_document.lower()) or index.get(_DEFAULT_RULE)
+
+
+_DEFAULT_RULE = "__default__"
+
+
+@functools.lru_cache(maxsize=8)
+def _rules_index(regles: tuple[tuple[Any, Any, Any], ...]) -> dict[str, tuple[str, str]]:
+    """
+    Index type (minuscules) -> (modele_chemin, modele_nom_fichier), première règle gagnante.
+    La règle "défaut" (défaut / defaut / default) est aussi rangée sous _DEFAULT_RULE.
+    Mis en cache par contenu des règles : reconstruit seulement quand elles changent.
+    """
+    index: dict[str, tuple[str, str]] = {}
+    for type_regle, modele_chemin, modele_nom_fichier in regles:
+        t = (type_regle or "").strip().lower()
+        rule = (modele_chemin or ""), (modele_nom_fichier or "")
+        index.setdefault(t, rule)
+        if t in ("défaut", "defaut", "default"):
+            index.setdefault(_DEFAULT_RULE, rule)
+    return index
 
 
 def get_filename_template_for_dest(
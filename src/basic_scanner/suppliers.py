@@ -2,6 +2,7 @@
 Dictionnaire de fournisseurs + matching fuzzy (rapidfuzz).
 Mappe le texte brut extrait vers un nom de dossier normalisé.
 """
+import functools
 from typing import Optional
 
 from basic_scanner.logging_conf import get_logger
@@ -13,10 +14,12 @@ logger = get_logger("suppliers")
 DEFAULT_SCORE_CUTOFF = 70
 
 
+@functools.cache
 def _get_rapidfuzz():
+    """(fuzz, process) ou None ; import tenté une seule fois (un import manquant reparcourt sys.path à chaque essai)."""
     try:
-        from rapidfuzz import fuzz
-        return fuzz
+        from rapidfuzz import fuzz, process
+        return fuzz, process
     except ImportError:
         return None
 
@@ -34,32 +37,80 @@ def resolve_fournisseur(
     if not raw or not mapping_fournisseurs:
         return
 
-    fuzz_mod = _get_rapidfuzz()
-    if not fuzz_mod:
+    # Le mapping fait partie de la clé de cache : le modifier (GUI, rechargement config) suffit à invalider
+    best = _resolve_cached(raw.lower(), tuple(mapping_fournisseurs.items()), score_cutoff)
+    if best:
+        best_value, best_ratio = best
+        extracted.fournisseur = best_value
+        if best_ratio is not None:
+            logger.debug("Fournisseur matché: '%s' -> '%s' (score %s)", raw, best_value, best_ratio)
+
+
+@functools.lru_cache(maxsize=2048)
+def _resolve_cached(
+    raw_lower: str,
+    mapping_items: tuple[tuple[str, str], ...],
+    score_cutoff: int,
+) -> Optional[tuple[str, Optional[int]]]:
+    """
+    Résolution pure (nom dossier, score) ou None, mise en cache : les factures d'un même fournisseur
+    reviennent avec le même fournisseur_raw et ne refont pas le matching fuzzy.
+    """
+    rapidfuzz = _get_rapidfuzz()
+    if not rapidfuzz:
         # Fallback : match exact dans le mapping
-        for key, value in mapping_fournisseurs.items():
-            if key.lower() in raw.lower():
-                extracted.fournisseur = value
-                return
-        return
+        for alias, (_, value) in zip(_lowered_aliases(mapping_items), mapping_items):
+            if alias in raw_lower:
+                return value, None
+        return None
+    fuzz, process = rapidfuzz
 
-    # Liste des clés (alias / raisons sociales) et valeurs (nom dossier)
-    candidates = list(mapping_fournisseurs.items())
-    best_ratio = 0
-    best_value: Optional[str] = None
-
-    for alias, folder_name in candidates:
-        # ratio sur la chaîne complète
-        r = fuzz_mod.ratio(raw.lower(), alias.lower())
-        if r >= score_cutoff and r > best_ratio:
-            best_ratio = r
-            best_value = folder_name
-        # partial_ratio si le texte extrait contient l'alias
-        pr = fuzz_mod.partial_ratio(raw.lower(), alias.lower())
-        if pr >= score_cutoff and pr > best_ratio:
-            best_ratio = pr
-            best_value = folder_name
-
-    if best_value:
-        extracted.fournisseur = best_value
-        logger.debug("Fournisseur matché: '%s' -> '%s' (score %s)", raw, best_value, best_ratio)
+    aliases = _lowered_aliases(mapping_items)
+    # Texte identique à un alias (cas le plus courant) : ratio de 100 sans passe fuzzy sur ratio ;
+    # reste seulement à vérifier qu'aucun alias placé avant n'atteint 100 en partial_ratio
+    exact_index = _exact_alias_index(mapping_items).get(raw_lower)
+    best = None if exact_index is None else (100.0, exact_index)  # (score, index)
+    scorers = (fuzz.ratio, fuzz.partial_ratio) if best is None else (fuzz.partial_ratio,)
+
+    # Meilleur alias selon ratio (chaîne complète) puis selon partial_ratio (le texte extrait contient l'alias) :
+    # chaque passe parcourt tous les alias dans rapidfuzz (C++), pas dans une boucle Python.
+    # Le seuil de la 2e passe est relevé au meilleur score déjà trouvé : rapidfuzz écarte alors la plupart
+    # des alias sans calcul complet (bornes sur les longueurs). Après un 100, seuls les alias placés avant
+    # le gagnant peuvent encore l'emporter (à égalité).
+    for scorer in scorers:
+        # (arrondi inférieur : avec un seuil flottant exact, rapidfuzz peut écarter un score égal)
+        cutoff = score_cutoff if best is None else max(score_cutoff, int(best[0]))
+        choices = aliases if best is None or best[0] < 100 else aliases[:best[1]]
+        if not choices:
+            break
+        hit = process.extractOne(raw_lower, choices, scorer=scorer, score_cutoff=cutoff)
+        if hit is None:
+            continue
+        _, score, index = hit
+        # À score égal, l'alias cité en premier dans le mapping l'emporte
+        if best is None or score > best[0] or (score == best[0] and index < best[1]):
+            best = (score, index)
+
+    if best is None:
+        return None
+    best_ratio, index = best
+    best_value = mapping_items[index][1]
+    return (best_value, best_ratio) if best_value else None
+
+
+@functools.lru_cache(maxsize=8)
+def _lowered_aliases(mapping_items: tuple[tuple[str, str], ...]) -> tuple[str, ...]:
+    """
+    Clés (alias / raisons sociales) en minuscules, dans l'ordre du mapping.
+    Calculées une fois par mapping et non à chaque fournisseur_raw inconnu du cache de résolution.
+    """
+    return tuple(alias.lower() for alias, _ in mapping_items)
+
+
+@functools.lru_cache(maxsize=8)
+def _exact_alias_index(mapping_items: tuple[tuple[str, str], ...]) -> dict[str, int]:
+    """Alias en minuscules -> position du premier alias identique dans le mapping."""
+    index: dict[str, int] = {}
+    for i, alias in enumerate(_lowered_aliases(mapping_items)):
+        index.setdefault(alias, i)
+    return index
@@ -3,11 +3,15 @@ Surveillance du dossier INBOX (watchdog) + file stability check.
 Détecte les nouveaux PDF, attend que la taille soit stable pendant N secondes avant traitement.
 """
 import fnmatch
+import os
+import re
+import threading
 import time
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Optional
 
-from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
 from basic_scanner.logging_conf import get_logger
@@ -15,13 +19,43 @@ from basic_scanner.logging_conf import get_logger
 logger = get_logger("watcher")
 
 
-def _matches_exclude(path: Path, exclude_patterns: list[str]) -> bool:
-    """True si le fichier doit être exclu (tmp, ~, .part, etc.)."""
-    name = path.name
+ExcludeRules = tuple[tuple[str, ...], tuple[str, ...], Optional[re.Pattern]]
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def compile_exclude_patterns(exclude_patterns: list[str]) -> ExcludeRules:
+    """
+    Prépare une fois les motifs d'exclusion (syntaxe fnmatch) : (suffixes, préfixes, regex).
+    « *.tmp » devient un suffixe, « ~* » un préfixe (tests str.endswith / str.startswith),
+    les autres motifs sont réunis en une seule regex compilée. Casse normalisée comme fnmatch (os.path.normcase).
+    """
+    suffixes, prefixes, regexes = [], [], []
     for pattern in exclude_patterns:
-        if fnmatch.fnmatch(name, pattern):
-            return True
-    return False
+        pattern = os.path.normcase(pattern)
+        if pattern.startswith("*") and not _GLOB_CHARS.intersection(pattern[1:]):
+            suffixes.append(pattern[1:])
+        elif pattern.endswith("*") and not _GLOB_CHARS.intersection(pattern[:-1]):
+            prefixes.append(pattern[:-1])
+        else:
+            regexes.append(f"(?:{fnmatch.translate(pattern)})")
+    return tuple(suffixes), tuple(prefixes), re.compile("|".join(regexes)) if regexes else None
+
+
+def matches_exclude(name: str, rules: ExcludeRules) -> bool:
+    """True si le fichier (nom) doit être exclu (tmp, ~, .part, etc.)."""
+    suffixes, prefixes, regex = rules
+    name = os.path.normcase(name)
+    return name.endswith(suffixes) or name.startswith(prefixes) or (regex is not None and regex.match(name) is not None)
+
+
+@dataclass(slots=True)
+class _PendingFile:
+    """État d'un fichier en attente, mis à jour sur place à chaque changement (pas de nouveau tuple)."""
+
+    size: int
+    mtime_ns: int
+    since: float  # instant (monotonic) du dernier changement
 
 
 class StableFileHandler(FileSystemEventHandler):
@@ -44,88 +78,119 @@ class StableFileHandler(FileSystemEventHandler):
         self.check_interval = check_interval
         self.min_file_size = min_file_size
         self.exclude_patterns = exclude_patterns or ["*.tmp", "~*", "*.part"]
-        # Fichiers en attente : path -> (last_size, last_check_time)
-        self._pending: dict[Path, tuple[int, float]] = {}
-
-    def _is_pdf(self, path: Path) -> bool:
-        return path.suffix.lower() == ".pdf"
-
-    def _should_ignore(self, path: Path) -> bool:
-        if not self._is_pdf(path):
-            return True
-        if _matches_exclude(path, self.exclude_patterns):
-            return True
-        try:
-            if path.stat().st_size < self.min_file_size:
+        self._exclude = compile_exclude_patterns(self.exclude_patterns)
+        # Fichiers en attente : chemin absolu non résolu -> taille, mtime et instant du dernier changement
+        self._pending: dict[Path, _PendingFile] = {}
+        # Posé quand un fichier est mis en attente : réveille la boucle de stabilité endormie
+        self._wakeup = threading.Event()
+
+    def _is_pdf(self, name: str) -> bool:
+        return name[-4:].lower() == ".pdf"
+
+    def _is_ignored_name(self, name: str) -> bool:
+        """Filtre sur le seul nom (extension, motifs d'exclusion), sans accès disque."""
+        return not self._is_pdf(name) or matches_exclude(name, self._exclude)
+
+    def _should_ignore(self, path: Path, size: Optional[int] = None) -> bool:
+        """size : taille déjà connue (évite un stat), sinon lue sur le disque."""
+        return self._is_ignored_name(path.name) or self._is_too_small(path, size)
+
+    def _is_too_small(self, path: Path, size: Optional[int] = None) -> bool:
+        """Fichier sous min_file_size (ou illisible) ; size : taille déjà connue, sinon lue sur le disque."""
+        if size is None:
+            try:
+                size = os.stat(path).st_size
+            except OSError:
                 return True
-        except OSError:
-            return True
-        return False
+        return size < self.min_file_size
 
     def _schedule_check(self, path: Path) -> None:
         """Enregistre le fichier pour une vérification de stabilité."""
-        path = path.resolve()
+        # abspath (calcul sur la chaîne) et non resolve (appels système) : un fichier en cours d'écriture
+        # produit un événement par écriture, et tous retrouvent ici la même clé. Résolu une fois, à la fin.
+        path = Path(os.path.abspath(path))
         if path in self._pending:
             return
         try:
-            size = path.stat().st_size
+            st = os.stat(path)
         except OSError:
             return
-        self._pending[path] = (size, time.monotonic())
+        # Taille minimale vérifiée sur ce même stat (pas de stat préalable à chaque événement)
+        if st.st_size < self.min_file_size:
+            return
+        self._pending[path] = _PendingFile(st.st_size, st.st_mtime_ns, time.monotonic())
+        self._wakeup.set()
         logger.debug("Fichier en attente (stabilité): %s", path.name)
 
+    def next_check_delay(self) -> Optional[float]:
+        """
+        Secondes avant la prochaine échéance (fichier en attente depuis stability_seconds sans changement
+        observé), au moins check_interval ; None si aucun fichier n'est en attente.
+        """
+        try:
+            oldest = min(entry.since for entry in list(self._pending.values()))
+        except ValueError:
+            return None
+        return max(oldest + self.stability_seconds - time.monotonic(), self.check_interval)
+
     def _check_pending(self) -> None:
-        """Parcourt les fichiers en attente et déclenche le callback si stables."""
+        """
+        Vérifie les fichiers arrivés à échéance et déclenche le callback si stables.
+        Les autres ne sont pas relus : un changement éventuel sera vu à leur échéance.
+        """
         now = time.monotonic()
-        to_remove = []
         to_process = []
+        # Copie des entrées, faite d'un seul appel C (sans rendre la main au thread watchdog, qui en ajoute) :
+        # parcourir self._pending.items() directement peut lever « dictionary changed size during iteration »
+        due = [(path, entry) for path, entry in list(self._pending.items())
+               if now - entry.since >= self.stability_seconds]
+        if not due:
+            return
 
-        for path, (last_size, last_check) in list(self._pending.items()):
+        for path, entry in due:
+            # Un stat par fichier dû, et non DirEntry.stat d'un parcours du dossier : sous Windows ce dernier
+            # renvoie taille et date de l'entrée NTFS, mises à jour en retard tant que l'écrivain garde
+            # le fichier ouvert (fichier disparu = OSError)
             try:
-                if not path.exists():
-                    to_remove.append(path)
-                    continue
-                size = path.stat().st_size
+                st = os.stat(path)
             except OSError:
-                to_remove.append(path)
+                self._pending.pop(path, None)
                 continue
 
-            if size != last_size:
-                # Taille changée : mettre à jour et repartir le délai
-                self._pending[path] = (size, now)
+            if st.st_size != entry.size or st.st_mtime_ns != entry.mtime_ns:
+                # Fichier modifié depuis la dernière lecture : mettre à jour et repartir le délai
+                entry.size = st.st_size
+                entry.mtime_ns = st.st_mtime_ns
+                entry.since = now
                 continue
 
-            elapsed = now - last_check
-            if elapsed >= self.stability_seconds:
-                to_remove.append(path)
-                to_process.append(path)
-
-        for p in to_remove:
-            self._pending.pop(p, None)
+            self._pending.pop(path, None)
+            to_process.append((path, st.st_size))
 
-        for path in to_process:
-            if path.exists() and not self._should_ignore(path):
+        for path, size in to_process:
+            if not self._should_ignore(path, size):
+                path = path.resolve()
                 logger.info("Fichier stable, traitement: %s", path.name)
                 try:
                     self.on_stable_file(path)
                 except Exception as e:
                     logger.exception("Erreur dans on_stable_file pour %s: %s", path, e)
 
-    def on_created(self, event: FileSystemEvent) -> None:
+    def _on_file_event(self, event: FileSystemEvent) -> None:
         if event.is_directory:
             return
-        path = Path(event.src_path)
-        if self._should_ignore(path):
+        # Rejet sur la chaîne brute (extension, exclusions) avant de construire un Path :
+        # la plupart des événements d'un dossier partagé ne concernent pas un PDF
+        src = os.fsdecode(event.src_path)
+        if self._is_ignored_name(os.path.basename(src)):
             return
-        self._schedule_check(path)
+        self._schedule_check(Path(src))
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        self._on_file_event(event)
 
     def on_modified(self, event: FileSystemEvent) -> None:
-        if event.is_directory:
-            return
-        path = Path(event.src_path)
-        if self._should_ignore(path):
-            return
-        self._schedule_check(path)
+        self._on_file_event(event)
 
     def get_pending_count(self) -> int:
         return len(self._pending)
@@ -151,22 +216,37 @@ def run_watcher(
         exclude_patterns=exclude_patterns,
     )
     observer = Observer()
-    observer.schedule(handler, str(inbox_path), recursive=False)
-
-    # Thread ou timer pour _check_pending : on utilise un thread dédié simple
-    import threading
+    # Seuls les événements création / modification de fichier sont remontés : sous Linux le masque inotify
+    # est restreint en conséquence, ouvertures, fermetures et suppressions ne passent plus par Python
+    observer.schedule(
+        handler, str(inbox_path), recursive=False,
+        event_filter=[FileCreatedEvent, FileModifiedEvent],
+    )
 
+    # Thread dédié pour _check_pending : dort jusqu'à la prochaine échéance d'un fichier en attente
+    # (pas de réveil périodique), et sans délai tant qu'aucun fichier n'est en attente.
+    # Un fichier ajouté a toujours une échéance plus tardive que ceux déjà en attente : inutile de réveiller
+    # une attente en cours.
     stop_flag = threading.Event()
 
     def stability_loop() -> None:
-        while not stop_flag.wait(handler.check_interval):
+        while not stop_flag.is_set():
+            delay = handler.next_check_delay()
+            if delay is None:
+                handler._wakeup.wait()
+                handler._wakeup.clear()
+                continue
+            if stop_flag.wait(delay):
+                break
             handler._check_pending()
 
     stability_thread = threading.Thread(target=stability_loop, daemon=True)
     stability_thread.start()
 
     # Stocker pour pouvoir arrêter plus tard (optionnel)
+    # Arrêt : _stability_stop.set() puis _stability_wakeup.set() pour réveiller la boucle endormie
     observer._stability_stop = stop_flag  # type: ignore
+    observer._stability_wakeup = handler._wakeup  # type: ignore
     observer._stability_thread = stability_thread  # type: ignore
 
     observer.start()
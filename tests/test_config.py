@@ -0,0 +1,27 @@
+"""
+Tests unitaires pour la normalisation des chemins de la configuration.
+"""
+from pathlib import Path
+
+from basic_scanner.config import _normalize_config
+
+
+class TestNormalizeConfig:
+    """Chemins relatifs résolus depuis le dossier du config, chemins absolus gardés tels quels."""
+
+    def test_relatif_au_config(self, tmp_path):
+        out = _normalize_config({"inbox": "INBOX", "racine_destination": "DEST"}, tmp_path)
+        assert out["inbox"] == str((tmp_path / "INBOX").resolve())
+        assert out["racine_destination"] == str((tmp_path / "DEST").resolve())
+
+    def test_absolu_sans_reduction_des_points(self, tmp_path):
+        """« .. » n'est pas réduit lexicalement (lien symbolique possible sur le chemin)."""
+        racine = str(tmp_path / "lien" / ".." / "DEST")
+        out = _normalize_config({"racine_destination": racine, "dossier_failed": "../FAILED"}, tmp_path)
+        assert out["racine_destination"] == str(Path(racine))
+        assert out["dossier_failed"] == str(Path(racine) / ".." / "FAILED")
+
+    def test_dossiers_relatifs_a_racine(self, tmp_path):
+        racine = str(tmp_path / "DEST")
+        out = _normalize_config({"racine_destination": racine, "dossier_a_classer": "A_CLASSER"}, tmp_path)
+        assert out["dossier_a_classer"] == str(Path(racine) / "A_CLASSER")
@@ -0,0 +1,116 @@
+"""
+Tests unitaires pour mover (déplacement sans écrasement, repli copie entre volumes).
+"""
+import errno
+import os
+import shutil
+import threading
+
+import pytest
+
+from basic_scanner import mover
+
+
+def _raise_exdev(*args, **kwargs):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Simule une destination sur un autre volume : rename / link échouent avec EXDEV."""
+    monkeypatch.setattr(os, "rename", _raise_exdev)
+    monkeypatch.setattr(os, "link", _raise_exdev)
+
+
+class TestMoveFile:
+    """Tests _move_file (même volume, autre volume, cible existante)."""
+
+    def test_meme_volume(self, tmp_path):
+        src = tmp_path / "a.pdf"
+        src.write_bytes(b"pdf")
+        dest = tmp_path / "out" / "b.pdf"
+        dest.parent.mkdir()
+        mover._move_file(src, dest)
+        assert not src.exists()
+        assert dest.read_bytes() == b"pdf"
+
+    def test_cible_existante_jamais_remplacee(self, tmp_path):
+        src = tmp_path / "a.pdf"
+        src.write_bytes(b"nouveau")
+        dest = tmp_path / "b.pdf"
+        dest.write_bytes(b"ancien")
+        with pytest.raises(FileExistsError):
+            mover._move_file(src, dest)
+        assert src.read_bytes() == b"nouveau"
+        assert dest.read_bytes() == b"ancien"
+
+    def test_autre_volume_copie_puis_suppression(self, tmp_path, cross_device):
+        src = tmp_path / "a.pdf"
+        src.write_bytes(b"pdf")
+        dest = tmp_path / "b.pdf"
+        mover._move_file(src, dest)
+        assert not src.exists()
+        assert dest.read_bytes() == b"pdf"
+
+    def test_autre_volume_cible_existante(self, tmp_path, cross_device):
+        src = tmp_path / "a.pdf"
+        src.write_bytes(b"nouveau")
+        dest = tmp_path / "b.pdf"
+        dest.write_bytes(b"ancien")
+        with pytest.raises(FileExistsError):
+            mover._move_file(src, dest)
+        assert src.read_bytes() == b"nouveau"
+        assert dest.read_bytes() == b"ancien"
+
+    def test_autre_volume_echec_copie(self, tmp_path, cross_device, monkeypatch):
+        """Copie interrompue : copie partielle supprimée, source intacte."""
+        src = tmp_path / "a.pdf"
+        src.write_bytes(b"pdf complet")
+        dest = tmp_path / "b.pdf"
+
+        def partial_copy(s, d):
+            with open(d, "wb") as f:
+                f.write(b"pdf")
+            raise OSError(errno.ENOSPC, "No space left on device")
+
+        monkeypatch.setattr(shutil, "copyfile", partial_copy)
+        with pytest.raises(OSError):
+            mover._move_file(src, dest)
+        assert not dest.exists()
+        assert src.read_bytes() == b"pdf complet"
+
+
+class TestMoveToUnique:
+    """Tests _move_to_unique (suffixes, workers concurrents)."""
+
+    def test_suffixe_si_nom_pris(self, tmp_path):
+        (tmp_path / "X.pdf").write_bytes(b"premier")
+        src = tmp_path / "in.pdf"
+        src.write_bytes(b"second")
+        final = mover._move_to_unique(src, tmp_path, "X.pdf")
+        assert final == tmp_path / "X_1.pdf"
+        assert (tmp_path / "X.pdf").read_bytes() == b"premier"
+        assert final.read_bytes() == b"second"
+
+    def test_workers_concurrents_meme_nom(self, tmp_path):
+        """Deux workers visant le même nom : aucun fichier écrasé."""
+        dest = tmp_path / "out"
+        dest.mkdir()
+        sources = []
+        for i in range(8):
+            src = tmp_path / f"in{i}.pdf"
+            src.write_bytes(f"doc {i}".encode())
+            sources.append(src)
+        barrier = threading.Barrier(len(sources))
+
+        def worker(src):
+            barrier.wait()
+            mover._move_to_unique(src, dest, "0000-00-00_courrier.pdf")
+
+        threads = [threading.Thread(target=worker, args=(src,)) for src in sources]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        contents = sorted(p.read_bytes() for p in dest.iterdir())
+        assert contents == sorted(f"doc {i}".encode() for i in range(8))
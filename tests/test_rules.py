@@ -67,6 +67,18 @@ class TestApplyTemplate:
         p = {"YYYY": "2024", "MM": "03", "DD": "15", "type_doc": "FACT", "fournisseur": "EDF", "numero": "FAC-001"}
         assert "2024-03-15_FACT_EDF_FAC-001" in apply_template(t, p)
 
+    def test_placeholder_inconnu_supprime(self):
+        assert apply_template("{YYYY}_{inconnu}.pdf", {"YYYY": "2024"}) == "2024_.pdf"
+
+    def test_accolade_isolee(self):
+        assert apply_template("a{b_{YYYY}", {"YYYY": "2024"}) == "a{b_2024"
+
+    def test_accolades_restantes_supprimees(self):
+        p = {"fournisseur": "EDF", "YYYY": "2024", "client": "{X}"}
+        assert apply_template("{{fournisseur}}", p) == ""
+        assert apply_template("{x{YYYY}}_a", p) == "_a"
+        assert apply_template("Clients/{client}/{YYYY}", p) == "Clients//2024"
+
 
 class TestBuildDestinationPath:
     """Tests construction du chemin de destination."""
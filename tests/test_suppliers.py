@@ -0,0 +1,36 @@
+"""
+Tests unitaires pour suppliers (matching fuzzy du fournisseur).
+"""
+import pytest
+
+from basic_scanner.models import ExtractedData
+from basic_scanner.suppliers import resolve_fournisseur
+
+pytest.importorskip("rapidfuzz")
+
+
+def _resolve(raw, mapping):
+    extracted = ExtractedData(type_document="facture_fournisseur", fournisseur_raw=raw)
+    resolve_fournisseur(extracted, mapping)
+    return extracted.fournisseur
+
+
+class TestResolveFournisseur:
+    """Tests resolve_fournisseur (ratio, partial_ratio, égalités)."""
+
+    def test_alias_contenu_dans_le_texte(self):
+        mapping = {"EDF": "EDF", "Orange": "Orange"}
+        assert _resolve("Facture ORANGE SA - janvier", mapping) == "Orange"
+
+    def test_aucun_match(self):
+        assert _resolve("Boulangerie", {"EDF": "EDF"}) is None
+
+    def test_egalite_premier_alias_gagne(self):
+        # partial_ratio de "dcbcca" = ratio de "dcb" : l'alias cité en premier l'emporte
+        assert _resolve("dcdb", {"dcbcca": "A", "dcb": "B"}) == "A"
+        assert _resolve("dcdb", {"dcb": "B", "dcbcca": "A"}) == "B"
+
+    def test_texte_identique_a_un_alias(self):
+        assert _resolve("edf", {"Orange": "Orange", "EDF": "EDF"}) == "EDF"
+        # Un alias placé avant et contenu dans le texte (partial_ratio 100) garde la priorité
+        assert _resolve("EDF", {"ED": "Autre", "EDF": "EDF"}) == "Autre"
@@ -1,13 +1,14 @@
 """
 Tests unitaires pour la logique de file stability (taille inchangée N secondes).
 """
+import fnmatch
 import tempfile
 import time
 from pathlib import Path
 
 import pytest
 
-from basic_scanner.watcher import StableFileHandler
+from basic_scanner.watcher import StableFileHandler, compile_exclude_patterns, matches_exclude
 
 
 class TestStableFileHandler:
@@ -77,3 +78,59 @@ class TestStableFileHandler:
             assert len(called) == 0
         finally:
             path.unlink(missing_ok=True)
+
+    def test_next_check_delay_sans_fichier(self):
+        """Aucun fichier en attente : pas d'échéance (la boucle dort sur _wakeup)."""
+        handler = StableFileHandler(lambda p: None, stability_seconds=0.2, check_interval=0.05)
+        assert handler.next_check_delay() is None
+
+    def test_schedule_check_reveille_la_boucle(self):
+        """_schedule_check lève _wakeup et fixe une échéance à stability_seconds."""
+        handler = StableFileHandler(lambda p: None, stability_seconds=5.0, check_interval=0.05)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(b"content")
+            path = Path(f.name)
+        try:
+            assert not handler._wakeup.is_set()
+            handler._schedule_check(path)
+            assert handler._wakeup.is_set()
+            delay = handler.next_check_delay()
+            assert delay is not None and 4.0 < delay <= 5.0
+        finally:
+            path.unlink(missing_ok=True)
+
+    def test_nouvelle_echeance_si_modifie(self):
+        """Fichier modifié avant son échéance : pas de callback, nouvelle échéance à partir de la vérification."""
+        called = []
+        handler = StableFileHandler(called.append, stability_seconds=0.2, check_interval=0.01)
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(b"content")
+            path = Path(f.name)
+        try:
+            handler._schedule_check(path)
+            path.write_text("more content now")
+            time.sleep(0.25)
+            assert handler.next_check_delay() == pytest.approx(0.01)
+            handler._check_pending()
+            assert called == []
+            assert handler.get_pending_count() == 1
+            assert handler.next_check_delay() > 0.1
+            time.sleep(0.25)
+            handler._check_pending()
+            assert len(called) == 1
+        finally:
+            path.unlink(missing_ok=True)
+
+
+_EXCLUDE_PATTERNS = [["*.tmp"], ["~*"], ["*.part"], ["*"], ["[!a]*.pdf"], ["*.tmp", "~*", "*.part", "[!a]*.pdf"]]
+_EXCLUDE_NAMES = ["scan.tmp", "SCAN.TMP", "~scan.pdf", "~SCAN.PDF", "x.part", "x.Part", "a.pdf", "A.PDF", "b.pdf", "b.PDF", "tmp", ""]
+
+
+class TestMatchesExclude:
+    """compile_exclude_patterns / matches_exclude doivent décider exactement comme fnmatch.fnmatch."""
+
+    @pytest.mark.parametrize("patterns", _EXCLUDE_PATTERNS)
+    @pytest.mark.parametrize("name", _EXCLUDE_NAMES)
+    def test_equivalent_fnmatch(self, patterns, name):
+        expected = any(fnmatch.fnmatch(name, p) for p in patterns)
+        assert matches_exclude(name, compile_exclude_patterns(patterns)) == expected